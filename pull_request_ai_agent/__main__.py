@@ -12,11 +12,9 @@ import sys
 from pull_request_ai_agent.ai_bot import AiModuleClient
 from pull_request_ai_agent.bot import PullRequestAIAgent
 from pull_request_ai_agent.log import init_logger_config
-from pull_request_ai_agent.model import BotSettings, find_default_config_path
+from pull_request_ai_agent.model import BotSettings
 from pull_request_ai_agent.project_management_tool import ProjectManagementToolType
 
-# Configure logging
-init_logger_config(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +56,9 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--pm-tool-api-key", help="API key for the project management tool")
 
+    # Logging settings
+    parser.add_argument("--verbose", action="store_true", help="Enable debug level logging")
+
     return parser.parse_args()
 
 
@@ -100,13 +101,10 @@ def main() -> None:
     # Parse command line arguments
     args = parse_args()
 
-    # Check for default config file if not specified
-    if not args.config_file:
-        default_config_path = find_default_config_path(args.repo_path if args.repo_path else ".")
-        if default_config_path:
-            logger.info(f"Found default configuration file: {default_config_path}")
+    # Configure logging
+    init_logger_config(level=logging.DEBUG if args.verbose else logging.INFO)
 
-    # Load settings
+    # Load settings (the default configuration file is looked up here if --config is not specified)
     settings = BotSettings.from_args(args)
 
     # Run the bot
@@ -90,6 +90,29 @@ def load_prompt_from_file(file_path: str | Path) -> str:
         raise
 
 
+def load_pr_template(project_root: str | Path = ".") -> str | None:
+    """
+    Load the pull request template of a project.
+
+    Args:
+        project_root: Root directory of the project.
+
+    Returns:
+        The content of *.github/PULL_REQUEST_TEMPLATE.md*, or None if the project doesn't have one.
+    """
+    pr_template_path = Path(project_root) / ".github" / "PULL_REQUEST_TEMPLATE.md"
+    logger.debug(f"Checking for PR template at: {pr_template_path}")
+
+    if not pr_template_path.exists():
+        return None
+
+    logger.info(f"Found PR template at: {pr_template_path}")
+    with open(pr_template_path, "r", encoding="utf-8") as file:
+        pr_template_content = file.read()
+    logger.debug(f"Loaded PR template ({len(pr_template_content)} characters)")
+    return pr_template_content
+
+
 def create_prompt_model(model_class: Type[T], prompt_name: PromptName) -> T:
     """
     Factory function to create a prompt model instance.
@@ -223,18 +246,13 @@ def process_prompt_template(
         logger.debug(f"Looking for PR template to replace {prompt_var_pr_template}")
         try:
             # Look for the PR template file
-            pr_template_path = Path(project_root) / ".github" / "PULL_REQUEST_TEMPLATE.md"
-            logger.debug(f"Checking for PR template at: {pr_template_path}")
-
-            if pr_template_path.exists():
-                logger.info(f"Found PR template at: {pr_template_path}")
-                with open(pr_template_path, "r", encoding="utf-8") as file:
-                    pr_template_content = file.read()
-                logger.debug(f"Loaded PR template ({len(pr_template_content)} characters)")
+            pr_template_content = load_pr_template(project_root)
+
+            if pr_template_content is not None:
                 prompt_content = prompt_content.replace(prompt_var_pr_template, pr_template_content)
             else:
                 # If template doesn't exist, replace with empty string
-                logger.warning(f"PR template not found at {pr_template_path}, using empty string")
+                logger.warning(f"PR template not found in {project_root}, using empty string")
                 prompt_content = prompt_content.replace(prompt_var_pr_template, "")
         except Exception as e:
             logger.error(f"Error replacing PR template variable: {str(e)}")
@@ -5,7 +5,7 @@ PullRequestAIAgent - A bot that helps developers create pull requests with AI-ge
 import logging
 import re
 import traceback
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from github.PullRequest import PullRequest
 
@@ -14,7 +14,7 @@ from .ai_bot._base.client import BaseAIClient
 from .ai_bot.claude.client import ClaudeClient
 from .ai_bot.gemini.client import GeminiClient
 from .ai_bot.gpt.client import GPTClient
-from .ai_bot.prompts.model import PRPromptData, prepare_pr_prompt_data
+from .ai_bot.prompts.model import PRPromptData, load_pr_template, prepare_pr_prompt_data
 from .git_hdlr import GitCodeConflictError, GitHandler
 from .github_opt import GitHubOperations
 from .model import ProjectManagementToolSettings
@@ -26,6 +26,22 @@ from .project_management_tool.jira.client import JiraAPIClient
 
 logger = logging.getLogger(__name__)
 
+# Common patterns for ticket IDs in commit messages, compiled once at import time
+# Adjust patterns based on your project's conventions
+_TICKET_ID_PATTERNS = (
+    re.compile(r"#(\d+)"),  # GitHub issue format: #123
+    re.compile(r"([A-Z]+-\d+)"),  # Jira format: PROJ-123
+    re.compile(r"CU-([a-z0-9]+)"),  # ClickUp format: CU-abc123
+    re.compile(r"Task-(\d+)"),  # Generic task format: Task-123
+)
+
+# Factories of the AI clients by type; the client classes are looked up when the factory is called
+_AI_CLIENT_MAP: Dict[AiModuleClient, Callable[[Optional[str]], BaseAIClient]] = {
+    AiModuleClient.GPT: lambda api_key: GPTClient(api_key=api_key),
+    AiModuleClient.CLAUDE: lambda api_key: ClaudeClient(api_key=api_key),
+    AiModuleClient.GEMINI: lambda api_key: GeminiClient(api_key=api_key),
+}
+
 
 class PullRequestAIAgent:
     """
@@ -169,16 +185,8 @@ class PullRequestAIAgent:
                 f"No API key provided for {client_type.name if hasattr(client_type, 'name') else client_type} AI client"
             )
 
-        if client_type == self.AI_CLIENT_GPT:
-            logger.debug("Creating GPT client")
-            return GPTClient(api_key=api_key)
-        elif client_type == self.AI_CLIENT_CLAUDE:
-            logger.debug("Creating Claude client")
-            return ClaudeClient(api_key=api_key)
-        elif client_type == self.AI_CLIENT_GEMINI:
-            logger.debug("Creating Gemini client")
-            return GeminiClient(api_key=api_key)
-        else:
+        create_client = _AI_CLIENT_MAP.get(client_type)
+        if create_client is None:
             logger.error(
                 f"Unsupported AI client type: {client_type.name if hasattr(client_type, 'name') else client_type}"
             )
@@ -186,6 +194,9 @@ class PullRequestAIAgent:
                 f"Unsupported AI client type: {client_type.name if hasattr(client_type, 'name') else client_type}"
             )
 
+        logger.debug(f"Creating {client_type.name} client")
+        return create_client(api_key)
+
     def _get_current_branch(self) -> str:
         """
         Get the name of the current git branch.
@@ -399,17 +410,8 @@ class PullRequestAIAgent:
         """
 
         def match_ticket_id(_value: str) -> str:
-            # Common patterns for ticket IDs in commit messages
-            # Adjust patterns based on your project's conventions
-            patterns = [
-                r"#(\d+)",  # GitHub issue format: #123
-                r"([A-Z]+-\d+)",  # Jira format: PROJ-123
-                r"CU-([a-z0-9]+)",  # ClickUp format: CU-abc123
-                r"Task-(\d+)",  # Generic task format: Task-123
-            ]
-
-            for pattern in patterns:
-                matches = re.search(pattern, _value)
+            for pattern in _TICKET_ID_PATTERNS:
+                matches = pattern.search(_value)
                 if matches:
                     ticket_id = matches.group(0)
                     if ticket_id == _value:
@@ -617,13 +619,8 @@ class PullRequestAIAgent:
 
             # Add PR template if available
             try:
-                from pathlib import Path
-
-                pr_template_path = Path(self.repo_path) / ".github" / "PULL_REQUEST_TEMPLATE.md"
-                if pr_template_path.exists():
-                    logger.debug(f"Loading PR template from: {pr_template_path}")
-                    with open(pr_template_path, "r", encoding="utf-8") as file:
-                        pr_template = file.read()
+                pr_template = self._load_pr_template()
+                if pr_template is not None:
                     prompt += f"## Pull Request Template\n{pr_template}\n\n"
                 else:
                     logger.debug("No PR template found")
@@ -644,6 +641,16 @@ class PullRequestAIAgent:
             logger.debug(f"Created fallback PRPromptData with title: {fallback_title}")
             return PRPromptData(title=fallback_title, description=prompt)
 
+    def _load_pr_template(self) -> Optional[str]:
+        """
+        Load the pull request template of the repository.
+
+        Returns:
+            Content of the PR template or None if the repository doesn't have one
+        """
+        logger.debug(f"Loading PR template from repository: {self.repo_path}")
+        return load_pr_template(self.repo_path)
+
     def _parse_ai_response_title(self, response: str) -> str:
         """
         Parse the AI-generated response into a PR title.
@@ -1,10 +1,9 @@
 import os
-import re
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
 
 from git import Repo
 from github import Github
-from github.PullRequest import PullRequest
 
 
 class NotFoundTargetGitBranch(RuntimeError):
@@ -16,28 +15,63 @@ class NotFoundTargetGitBranch(RuntimeError):
         return f"Cannot find the target git branch *{self._target_branch}*. Current all branches: {self._current_all_branches}."
 
 
+@dataclass
+class GitHubRepoPR:
+    full_name: str
+    number: int
+
+    def edit(self, state: str) -> None:
+        assert GITHUB
+        GITHUB.requester.requestJsonAndCheck(
+            "PATCH",
+            f"/repos/{self.full_name}/pulls/{self.number}",
+            input={"state": state},
+        )
+
+
 REPO: Optional[Repo] = None
 GITHUB: Optional[Github] = None
 
+SEARCH_OPEN_PR_QUERY: str = """
+query($owner: String!, $name: String!, $head: String!, $base: String!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: 1, headRefName: $head, baseRefName: $base, states: OPEN) {
+      nodes { number }
+    }
+  }
+}
+"""
+
 
 def init_git() -> None:
     global REPO
     REPO = Repo("./")
 
 
-def get_all_branch() -> List[str]:
-    return [ref.name for ref in REPO.refs]  # type: ignore[union-attr]
+def iter_all_branch() -> Iterator[str]:
+    # Let git walk the ref database once instead of building a GitPython Reference per ref, and read its output
+    # line by line so a search can stop at the first match
+    process = REPO.git.for_each_ref(  # type: ignore[union-attr]
+        "--format=%(refname:short)", "refs/heads", "refs/remotes", as_process=True
+    )
+    for line in process.stdout:
+        yield line.decode().rstrip("\n")
 
 
 def expect_branch_name() -> str:
     return os.environ["TEST_BRANCH"]
 
 
-def search_branch(name: str, all_branch: List[str]) -> str:
-    for branch in all_branch:
-        if re.search(re.escape(name), str(branch), re.IGNORECASE):
-            return branch.replace("origin/", "")
-    raise NotFoundTargetGitBranch(name, all_branch)
+def search_branch(name: str) -> str:
+    # The name is matched literally and case-insensitively, so a plain substring check is enough
+    target = name.lower()
+    scanned_branch: List[str] = []
+    for branch in iter_all_branch():
+        if target in branch.lower():
+            return branch.replace("origin/", "", 1)
+        scanned_branch.append(branch)
+    # Every branch has been scanned on a miss, so report them without walking the refs again
+    raise NotFoundTargetGitBranch(name, scanned_branch)
 
 
 def delete_remote_branch(name: str) -> None:
@@ -49,31 +83,29 @@ def init_github() -> None:
     GITHUB = Github(os.environ["GITHUB_TOKEN"])
 
 
-def search_github_repo_pr(head_branch: str) -> PullRequest:
+def search_github_repo_pr(head_branch: str) -> GitHubRepoPR:
     assert GITHUB
-    prs = GITHUB.get_repo(os.environ["GITHUB_REPOSITORY"]).get_pulls(
-        state="open",
-        base=os.environ["GITHUB_BASE_REF"] or "master",
-        head=head_branch,
+    full_name = os.environ["GITHUB_REPOSITORY"]
+    owner, name = full_name.split("/", 1)
+    base_branch = os.environ["GITHUB_BASE_REF"] or "master"
+    _, data = GITHUB.requester.graphql_query(
+        SEARCH_OPEN_PR_QUERY,
+        {"owner": owner, "name": name, "head": head_branch, "base": base_branch},
     )
-    one_page = prs.get_page(0)
-    assert one_page
-    print(f"[DEBUG] one_page {one_page}.")
-    target_pr = list(filter(lambda p: p.head.ref == head_branch, one_page))
-    print(f"[DEBUG] target_pr {target_pr}.")
-    assert target_pr
-    return target_pr[0]
+    nodes = data["data"]["repository"]["pullRequests"]["nodes"]
+    print(f"[DEBUG] target_pr {nodes}.")
+    assert nodes
+    return GitHubRepoPR(full_name=full_name, number=nodes[0]["number"])
 
 
-def delete_github_repo_pr(pr: PullRequest) -> None:
+def delete_github_repo_pr(pr: GitHubRepoPR) -> None:
     pr.edit(state="closed")
     print(f"Pull request #{pr.number} closed successfully.")
 
 
 def run() -> None:
     init_git()
-    all_branch = get_all_branch()
-    e2e_test_branch = search_branch(name=expect_branch_name(), all_branch=all_branch)
+    e2e_test_branch = search_branch(name=expect_branch_name())
     print(f"[DEBUG] Target branch: {e2e_test_branch}")
 
     init_github()
@@ -50,6 +50,11 @@ if [ ! -z "$CREATE_PR_BOT_PM_TOOL_API_KEY" ]; then
   ARGS="$ARGS --pm-tool-api-key $CREATE_PR_BOT_PM_TOOL_API_KEY"
 fi
 
+# Add logging settings if provided
+if [ "$CREATE_PR_BOT_VERBOSE" == "true" ]; then
+  ARGS="$ARGS --verbose"
+fi
+
 # Run the bot with the constructed arguments
 # Note: Other PM tool settings (organization_id, project_id, base_url, username)
 # will be picked up from environment variables by BotSettings.from_env()
@@ -84,6 +84,7 @@ else
   echo $test_path
 
   echo "🤖⚒ It would start to run testing with Python testing framework *pytest*."
+  # Distribute the test items to all CPU cores by *pytest-xdist*
   # shellcheck disable=SC2086
-  pytest $test_path
+  pytest -n auto $test_path
 fi
@@ -6,8 +6,7 @@ based on task tickets and git commits according to the PR template.
 """
 
 import re
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Generator, List, Optional
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -16,76 +15,7 @@ from pull_request_ai_agent.ai_bot import AiModuleClient
 from pull_request_ai_agent.bot import PullRequestAIAgent
 from pull_request_ai_agent.project_management_tool._base.model import BaseImmutableModel
 
-
-class MockTicket(BaseImmutableModel):
-    """Mock ticket for testing purposes."""
-
-    def __init__(self, **kwargs: Any) -> None:
-        for key, value in kwargs.items():
-            setattr(self, key, value)
-
-    # Instance method for serializing this instance
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert instance to dictionary."""
-        return {k: v for k, v in self.__dict__.items()}
-
-    @classmethod
-    def serialize(cls, data: Dict[str, Any]) -> Optional[BaseImmutableModel]:
-        """Implement required abstract method with correct signature."""
-        if not data:
-            return None
-        return cls(**data)
-
-
-class TestAIPRGeneration:
-    """Integration tests for AI PR generation."""
-
-    @pytest.fixture
-    def mock_project_management_client(self) -> MagicMock:
-        """Create a mock project management client."""
-        client = MagicMock()
-
-        # Define test tickets
-        feature_ticket = MockTicket(
-            id="CU-abc123",
-            name="Add AI-powered PR generation",
-            description="Implement a feature that uses AI to generate PR descriptions based on commit messages and task details.",
-            status="In Progress",
-            type="feature",
-        )
-
-        bug_ticket = MockTicket(
-            id="CU-def456",
-            name="Fix parsing bug in ticket extraction",
-            description="The ticket ID extraction from branch names fails when using certain formats.",
-            status="In Progress",
-            type="bug",
-        )
-
-        # Configure the mock client to return different tickets based on the ID
-        def get_ticket(ticket_id: str) -> Optional[MockTicket]:
-            # Handle both with and without the prefix
-            if ticket_id == "CU-abc123" or ticket_id == "abc123":
-                return feature_ticket
-            elif ticket_id == "CU-def456" or ticket_id == "def456":
-                return bug_ticket
-            return None
-
-        client.get_ticket.side_effect = get_ticket
-        return client
-
-    @pytest.fixture
-    def mock_ai_client(self) -> MagicMock:
-        """Create a mock AI client."""
-        client = MagicMock()
-
-        # Configure the mock to return a predefined response
-        def get_content(prompt: Any) -> str:
-            # Convert prompt to string if it's an object
-            prompt_str = prompt.description if hasattr(prompt, "description") else str(prompt)
-
-            if "Add AI-powered PR generation" in prompt_str or "CU-abc123" in prompt_str:
-                return """
+_FEATURE_RESP: str = """
 TITLE: Add AI-powered PR generation
 
 Here's a suggested PR description:
@@ -121,8 +51,8 @@ Here's a suggested PR description:
 * Created robust error handling for API failures
 ```
 """
-            elif "Fix parsing bug" in prompt_str or "CU-def456" in prompt_str:
-                return """
+
+_BUG_RESP: str = """
 TITLE: Fix parsing bug in ticket extraction
 
 Here's a suggested PR description:
@@ -158,8 +88,8 @@ Here's a suggested PR description:
 * Added validation to prevent false positive ticket ID matches
 ```
 """
-            else:
-                return """
+
+_DEFAULT_RESP: str = """
 TITLE: Default Test PR
 
 Here's a suggested PR description:
@@ -192,83 +122,216 @@ Here's a suggested PR description:
 ```
 """
 
-        client.get_content.side_effect = get_content
-        return client
-
-    @pytest.fixture
-    def mock_git_handler(self) -> MagicMock:
-        """Create a mock git handler."""
-        handler = MagicMock()
-
-        # Create mock commit data
-        feature_commits = [
-            {
-                "hash": "abcdef123456789",
-                "short_hash": "abcdef1",
-                "author": {"name": "John Doe", "email": "john.doe@example.com"},
-                "message": "feat(ai): Implement AI PR generation\n\nImplemented AI client integration for generating PR descriptions.",
-                "committed_date": 1621234567,
-                "authored_date": 1621234567,
-            },
-            {
-                "hash": "9876543210fedcba",
-                "short_hash": "9876543",
-                "author": {"name": "John Doe", "email": "john.doe@example.com"},
-                "message": "feat(ai): Add prompt formatting\n\nCreated structured prompt formatting for AI based on commit messages.",
-                "committed_date": 1621234667,
-                "authored_date": 1621234667,
-            },
-        ]
-
-        bug_commits = [
-            {
-                "hash": "1a2b3c4d5e6f7890",
-                "short_hash": "1a2b3c4",
-                "author": {"name": "Jane Smith", "email": "jane.smith@example.com"},
-                "message": "fix(parser): Update regex pattern for ticket extraction\n\nFixed the regex pattern to correctly handle more branch name formats.",
-                "committed_date": 1621235567,
-                "authored_date": 1621235567,
-            }
-        ]
-
-        def iter_commits(ref: str) -> List[Dict[str, Any]]:
-            if "feature" in ref:
-                return feature_commits
-            elif "bugfix" in ref:
-                return bug_commits
-            return []
-
-        # Mock the necessary methods
-        handler._get_current_branch.return_value = "feature/CU-abc123"
-        handler.repo.refs = []
-        handler.repo.iter_commits.side_effect = iter_commits
-        handler.repo.merge_base.return_value = [MagicMock(hexsha="base_commit_hash")]
-
-        return handler
-
-    @pytest.fixture
-    def pr_bot(
-        self, mock_project_management_client: MagicMock, mock_ai_client: MagicMock, mock_git_handler: MagicMock
-    ) -> PullRequestAIAgent:
-        """Create a PR bot with mock dependencies."""
-        with (
-            patch("pull_request_ai_agent.bot.GitHandler", return_value=mock_git_handler),
-            patch("pull_request_ai_agent.bot.GPTClient", return_value=mock_ai_client),
-        ):
-
-            bot = PullRequestAIAgent(
-                repo_path=".",
-                base_branch="main",
-                project_management_tool_type=PullRequestAIAgent.PM_TOOL_CLICKUP,
-                project_management_tool_config=MagicMock(api_key="fake_api_key"),
-                ai_client_type=AiModuleClient.GPT,
-                ai_client_api_key="fake_api_key",
-            )
-
-            # Replace clients with mocks
-            bot.project_management_client = mock_project_management_client
-
-            return bot
+_PR_TEMPLATE: str = """
+[//]: # (The target why you modify something.)
+## _Target_
+
+[//]: # (The summary what you did or your target.)
+* ### Task summary:
+
+    N/A.
+
+[//]: # (The task ID in ClickUp [project: https://app.clickup.com/9018752317/v/f/90183126979/90182605225] which maps this change.)
+* ### Task tickets:
+
+    * Task ID: N/A.
+    * Relative task IDs: N/A.
+
+[//]: # (The key changes like demonstration, as-is & to-be, etc. for reviewers could be faster understand what it changes)
+* ### Key point change (optional):
+
+    N/A.
+
+
+[//]: # (What's the scope in project it would affect with your modify? For example, would it affect CI workflow? Or any feature usage? Please list all the items which may be affected.)
+## _Effecting Scope_
+
+* N/A.
+
+
+[//]: # (The brief of major changes what your modify. Please list it.)
+## _Description_
+
+* N/A.
+"""
+
+# Mocked AI responses keyed by the ClickUp ticket ID found in the prompt
+_RESPONSES: Dict[Optional[str], str] = {
+    "CU-abc123": _FEATURE_RESP,
+    "CU-def456": _BUG_RESP,
+    None: _DEFAULT_RESP,
+}
+_TICKET_RE = re.compile(r"CU-[a-z0-9]+")
+
+# Sections of the PR template which must be in the generated PR body
+_REQUIRED_SECTIONS = tuple(
+    re.compile(p)
+    for p in (
+        r"## _Target_",
+        r"\* ### Task summary:",
+        r"\* ### Task tickets:",
+        r"## _Effecting Scope_",
+        r"## _Description_",
+    )
+)
+
+_FEATURE_COMMITS: List[Dict[str, Any]] = [
+    {
+        "hash": "abcdef123456789",
+        "short_hash": "abcdef1",
+        "author": {"name": "John Doe", "email": "john.doe@example.com"},
+        "message": "feat(ai): Implement AI PR generation\n\nImplemented AI client integration for generating PR descriptions.",
+        "committed_date": 1621234567,
+        "authored_date": 1621234567,
+    },
+    {
+        "hash": "9876543210fedcba",
+        "short_hash": "9876543",
+        "author": {"name": "John Doe", "email": "john.doe@example.com"},
+        "message": "feat(ai): Add prompt formatting\n\nCreated structured prompt formatting for AI based on commit messages.",
+        "committed_date": 1621234667,
+        "authored_date": 1621234667,
+    },
+]
+
+_BUG_COMMITS: List[Dict[str, Any]] = [
+    {
+        "hash": "1a2b3c4d5e6f7890",
+        "short_hash": "1a2b3c4",
+        "author": {"name": "Jane Smith", "email": "jane.smith@example.com"},
+        "message": "fix(parser): Update regex pattern for ticket extraction\n\nFixed the regex pattern to correctly handle more branch name formats.",
+        "committed_date": 1621235567,
+        "authored_date": 1621235567,
+    }
+]
+
+
+class MockTicket(BaseImmutableModel):
+    """Mock ticket for testing purposes."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    # Instance method for serializing this instance
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert instance to dictionary."""
+        return {k: v for k, v in self.__dict__.items()}
+
+    @classmethod
+    def serialize(cls, data: Dict[str, Any]) -> Optional[BaseImmutableModel]:
+        """Implement required abstract method with correct signature."""
+        if not data:
+            return None
+        return cls(**data)
+
+
+@pytest.fixture(scope="class")
+def mock_project_management_client() -> MagicMock:
+    """Create a mock project management client."""
+    client = MagicMock()
+
+    # Define test tickets
+    feature_ticket = MockTicket(
+        id="CU-abc123",
+        name="Add AI-powered PR generation",
+        description="Implement a feature that uses AI to generate PR descriptions based on commit messages and task details.",
+        status="In Progress",
+        type="feature",
+    )
+
+    bug_ticket = MockTicket(
+        id="CU-def456",
+        name="Fix parsing bug in ticket extraction",
+        description="The ticket ID extraction from branch names fails when using certain formats.",
+        status="In Progress",
+        type="bug",
+    )
+
+    # Configure the mock client to return different tickets based on the ID
+    def get_ticket(ticket_id: str) -> Optional[MockTicket]:
+        # Handle both with and without the prefix
+        if ticket_id == "CU-abc123" or ticket_id == "abc123":
+            return feature_ticket
+        elif ticket_id == "CU-def456" or ticket_id == "def456":
+            return bug_ticket
+        return None
+
+    client.get_ticket.side_effect = get_ticket
+    return client
+
+
+@pytest.fixture(scope="class")
+def mock_ai_client() -> MagicMock:
+    """Create a mock AI client."""
+    client = MagicMock()
+
+    # Configure the mock to return a predefined response
+    def get_content(prompt: Any) -> str:
+        # Convert prompt to string if it's an object
+        prompt_str = prompt.description if hasattr(prompt, "description") else str(prompt)
+
+        m = _TICKET_RE.search(prompt_str)
+        return _RESPONSES.get(m.group(0) if m else None, _DEFAULT_RESP)
+
+    client.get_content.side_effect = get_content
+    return client
+
+
+@pytest.fixture(scope="class")
+def mock_git_handler() -> MagicMock:
+    """Create a mock git handler."""
+    handler = MagicMock()
+
+    def iter_commits(ref: str) -> List[Dict[str, Any]]:
+        if "feature" in ref:
+            return _FEATURE_COMMITS
+        elif "bugfix" in ref:
+            return _BUG_COMMITS
+        return []
+
+    # Mock the necessary methods
+    handler._get_current_branch.return_value = "feature/CU-abc123"
+    handler.repo.refs = []
+    handler.repo.iter_commits.side_effect = iter_commits
+    handler.repo.merge_base.return_value = [MagicMock(hexsha="base_commit_hash")]
+
+    return handler
+
+
+@pytest.fixture(scope="class")
+def pr_bot(
+    mock_project_management_client: MagicMock, mock_ai_client: MagicMock, mock_git_handler: MagicMock
+) -> PullRequestAIAgent:
+    """Create a PR bot with mock dependencies."""
+    with (
+        patch("pull_request_ai_agent.bot.GitHandler", return_value=mock_git_handler),
+        patch("pull_request_ai_agent.bot.GPTClient", return_value=mock_ai_client),
+    ):
+
+        bot = PullRequestAIAgent(
+            repo_path=".",
+            base_branch="main",
+            project_management_tool_type=PullRequestAIAgent.PM_TOOL_CLICKUP,
+            project_management_tool_config=MagicMock(api_key="fake_api_key"),
+            ai_client_type=AiModuleClient.GPT,
+            ai_client_api_key="fake_api_key",
+        )
+
+        # Replace clients with mocks
+        bot.project_management_client = mock_project_management_client
+
+        return bot
+
+
+class TestAIPRGeneration:
+    """Integration tests for AI PR generation."""
+
+    @pytest.fixture(autouse=True)
+    def reset_current_branch(self, mock_git_handler: MagicMock) -> Generator[None, None, None]:
+        """Restore the current branch of the class-scoped git handler mock after each test."""
+        yield
+        mock_git_handler._get_current_branch.return_value = "feature/CU-abc123"
 
     def test_feature_pr_generation(self, pr_bot: PullRequestAIAgent, mock_git_handler: MagicMock) -> None:
         """Test generating a PR for a feature branch."""
@@ -278,24 +341,7 @@ Here's a suggested PR description:
 
         # Mock the get_branch_commits method to return feature commits
         with patch.object(pr_bot, "get_branch_commits") as mock_get_commits:
-            mock_get_commits.return_value = [
-                {
-                    "hash": "abcdef123456789",
-                    "short_hash": "abcdef1",
-                    "author": {"name": "John Doe", "email": "john.doe@example.com"},
-                    "message": "feat(ai): Implement AI PR generation\n\nImplemented AI client integration for generating PR descriptions.",
-                    "committed_date": 1621234567,
-                    "authored_date": 1621234567,
-                },
-                {
-                    "hash": "9876543210fedcba",
-                    "short_hash": "9876543",
-                    "author": {"name": "John Doe", "email": "john.doe@example.com"},
-                    "message": "feat(ai): Add prompt formatting\n\nCreated structured prompt formatting for AI based on commit messages.",
-                    "committed_date": 1621234667,
-                    "authored_date": 1621234667,
-                },
-            ]
+            mock_get_commits.return_value = _FEATURE_COMMITS
 
             # Extract the ticket ID
             ticket_id = pr_bot.extract_ticket_id(branch_name)
@@ -337,16 +383,7 @@ Here's a suggested PR description:
 
         # Mock the get_branch_commits method to return bug fix commits
         with patch.object(pr_bot, "get_branch_commits") as mock_get_commits:
-            mock_get_commits.return_value = [
-                {
-                    "hash": "1a2b3c4d5e6f7890",
-                    "short_hash": "1a2b3c4",
-                    "author": {"name": "Jane Smith", "email": "jane.smith@example.com"},
-                    "message": "fix(parser): Update regex pattern for ticket extraction\n\nFixed the regex pattern to correctly handle more branch name formats.",
-                    "committed_date": 1621235567,
-                    "authored_date": 1621235567,
-                }
-            ]
+            mock_get_commits.return_value = _BUG_COMMITS
 
             # Extract the ticket ID
             ticket_id = pr_bot.extract_ticket_id(branch_name)
@@ -382,45 +419,8 @@ Here's a suggested PR description:
 
     def test_pr_template_compliance(self, pr_bot: PullRequestAIAgent) -> None:
         """Test that generated PR bodies comply with the PR template format."""
-        # Get the actual PR template from the repository
-        pr_template_path = Path(pr_bot.repo_path) / ".github" / "PULL_REQUEST_TEMPLATE.md"
-
-        # Mock the file read operation
-        with patch("builtins.open", create=True) as mock_open:
-            # Set up the mock to return the PR template content
-            mock_open.return_value.__enter__.return_value.read.return_value = """
-[//]: # (The target why you modify something.)
-## _Target_
-
-[//]: # (The summary what you did or your target.)
-* ### Task summary:
-
-    N/A.
-
-[//]: # (The task ID in ClickUp [project: https://app.clickup.com/9018752317/v/f/90183126979/90182605225] which maps this change.)
-* ### Task tickets:
-
-    * Task ID: N/A.
-    * Relative task IDs: N/A.
-
-[//]: # (The key changes like demonstration, as-is & to-be, etc. for reviewers could be faster understand what it changes)
-* ### Key point change (optional):
-
-    N/A.
-
-
-[//]: # (What's the scope in project it would affect with your modify? For example, would it affect CI workflow? Or any feature usage? Please list all the items which may be affected.)
-## _Effecting Scope_
-
-* N/A.
-
-
-[//]: # (The brief of major changes what your modify. Please list it.)
-## _Description_
-
-* N/A.
-"""
-
+        # Load the PR template from a known content instead of the repository file
+        with patch("pull_request_ai_agent.ai_bot.prompts.model.load_pr_template", return_value=_PR_TEMPLATE):
             # Generate a PR body using a mock feature
             with patch.object(pr_bot, "get_branch_commits") as mock_get_commits:
                 # Mock commits
@@ -448,16 +448,8 @@ Here's a suggested PR description:
                 body = pr_bot._parse_ai_response_body(ai_response)
 
                 # Check for required sections from the template
-                required_sections = [
-                    r"## _Target_",
-                    r"\* ### Task summary:",
-                    r"\* ### Task tickets:",
-                    r"## _Effecting Scope_",
-                    r"## _Description_",
-                ]
-
-                for section in required_sections:
-                    assert re.search(section, body), f"Missing required section: {section}"
+                for pattern in _REQUIRED_SECTIONS:
+                    assert pattern.search(body), f"Missing required section: {pattern.pattern}"
 
                 # Check task ID is included
                 assert "CU-" in body, "Task ID not included in PR body"
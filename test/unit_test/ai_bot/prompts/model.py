@@ -17,6 +17,7 @@ from pull_request_ai_agent.ai_bot.prompts.model import (
     SummarizeChangeContentPrompt,
     create_prompt_model,
     get_prompt_model,
+    load_pr_template,
     load_prompt_from_file,
     prepare_pr_prompt_data,
     process_prompt_template,
@@ -271,6 +272,18 @@ class TestPromptModel:
         assert "Commits:" in result
         assert "{{ all_commits }}" not in result
 
+    def test_load_pr_template(self, tmp_path: Path) -> None:
+        """Test loading the PR template of a project."""
+        mock_pr_template = "## PR Template\n* Task ID: \n* Description: "
+        (tmp_path / ".github").mkdir()
+        (tmp_path / ".github" / "PULL_REQUEST_TEMPLATE.md").write_text(mock_pr_template, encoding="utf-8")
+
+        assert load_pr_template(tmp_path) == mock_pr_template
+
+    def test_load_pr_template_not_found(self, tmp_path: Path) -> None:
+        """Test loading the PR template of a project which doesn't have one."""
+        assert load_pr_template(tmp_path) is None
+
     def test_process_prompt_template_with_pr_template(self, mock_prompt_content: str) -> None:
         """Test processing a prompt template with PR template."""
         # Create a test prompt template
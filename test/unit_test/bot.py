@@ -2,14 +2,25 @@
 Unit tests for the PullRequestAIAgent class.
 """
 
-from typing import Any, Dict, Optional, cast
-from unittest.mock import MagicMock, PropertyMock, call, mock_open, patch
+import textwrap
+from contextlib import contextmanager
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, cast
+from unittest.mock import (
+    ANY,
+    MagicMock,
+    NonCallableMagicMock,
+    call,
+    create_autospec,
+)
 
 import pytest
 from github.PullRequest import PullRequest
 
+from pull_request_ai_agent import bot as bot_module
 from pull_request_ai_agent.ai_bot import AiModuleClient
 from pull_request_ai_agent.ai_bot.gpt.client import GPTClient
+from pull_request_ai_agent.ai_bot.prompts.model import PRPromptData
 from pull_request_ai_agent.bot import PullRequestAIAgent
 from pull_request_ai_agent.git_hdlr import GitCodeConflictError, GitHandler
 from pull_request_ai_agent.github_opt import GitHubOperations
@@ -21,6 +32,23 @@ from pull_request_ai_agent.project_management_tool.clickup.client import (
 )
 
 
+def _reset_spec_mock(mock: NonCallableMagicMock) -> MagicMock:
+    """Clear the calls, return values and side effects which the previous test left in a shared autospec mock."""
+    mock.reset_mock(return_value=True, side_effect=True)
+    return cast(MagicMock, mock)
+
+
+@contextmanager
+def swap_attr(obj: Any, name: str, new: Any) -> Iterator[Any]:
+    """Swap an attribute for the duration of the block, without the bookkeeping of *patch.object*."""
+    old = getattr(obj, name)
+    setattr(obj, name, new)
+    try:
+        yield new
+    finally:
+        setattr(obj, name, old)
+
+
 class SpyAgent(PullRequestAIAgent):
     def __init__(
         self,
@@ -29,7 +57,7 @@ class SpyAgent(PullRequestAIAgent):
         github_token: Optional[str] = None,
         github_repo: Optional[str] = None,
         project_management_tool_type: Optional[ProjectManagementToolType] = None,
-        project_management_tool_config: Optional[Dict[str, Any]] = None,
+        project_management_tool_config: Optional[ProjectManagementToolSettings] = None,
         ai_client_type: AiModuleClient = AiModuleClient.GPT,
         ai_client_api_key: Optional[str] = None,
     ):
@@ -39,7 +67,7 @@ class SpyAgent(PullRequestAIAgent):
         self.github_token: Optional[str] = github_token
         self.github_repo: Optional[str] = github_repo
         self.project_management_tool_type: Optional[ProjectManagementToolType] = project_management_tool_type
-        self.project_management_tool_config: Optional[Dict[str, Any]] = project_management_tool_config
+        self.project_management_tool_config: Optional[ProjectManagementToolSettings] = project_management_tool_config
         self.ai_client_type: AiModuleClient = ai_client_type
         self.ai_client_api_key: Optional[str] = ai_client_api_key
 
@@ -50,91 +78,197 @@ class SpyAgent(PullRequestAIAgent):
         self.ai_client: Optional[Any] = None  # type: ignore[assignment]
 
 
+# Test data shared by reference across the fixtures; read-only so no test can leak changes into another
+_MOCK_COMMIT = MappingProxyType(
+    {
+        "hash": "1234567890abcdef1234567890abcdef12345678",
+        "short_hash": "1234567",
+        "author": MappingProxyType({"name": "Test Author", "email": "test@example.com"}),
+        "committer": MappingProxyType({"name": "Test Author", "email": "test@example.com"}),
+        "message": "Test commit message",
+        "committed_date": 1620000000,
+        "authored_date": 1620000000,
+    }
+)
+_PR_HTML_URL = "https://github.com/owner/repo/pull/123"
+# Commits and structured ticket info which the prepare_ai_prompt tests build their prompts from
+_FULL_COMMITS = [
+    {"short_hash": "abc123", "message": "Fix bug in login form", "author": "John Doe", "date": "2023-01-01"},
+    {"short_hash": "def456", "message": "Add new feature", "author": "Jane Smith", "date": "2023-01-02"},
+]
+_ONE_COMMIT = _FULL_COMMITS[:1]
+_STANDARD_TICKET_INFO = MappingProxyType(
+    {
+        "id": "PROJ-123",
+        "title": "Fix login bug",
+        "description": "The login form has a bug that needs to be fixed",
+        "status": "In Progress",
+    }
+)
+_TICKET_INFOS = [
+    _STANDARD_TICKET_INFO,
+    {
+        "id": "PROJ-456",
+        "title": "Implement new feature",
+        "description": "Add a new feature to the application",
+        "status": "In Review",
+    },
+]
+# AI responses which the mocked AI client returns and the response parsing tests parse
+_AI_RESPONSE_TITLE_BODY = textwrap.dedent(
+    """\
+    TITLE: Test PR title
+
+    BODY:
+    This is a test PR description.
+    It includes multiple lines.
+    """
+)
+_AI_RESPONSE_MARKDOWN = textwrap.dedent(
+    """\
+    Here's the PR description:
+
+    ```markdown
+    ## _Target_
+
+    * ### Task summary:
+        This is the PR body.
+        It spans multiple lines.
+
+    * ### Task tickets:
+        * Task ID: TEST-123
+    ```
+    """
+)
+
+
+def _indented(response: str) -> str:
+    """Prefix every line of an AI response with whitespace, the way a model sometimes formats its output."""
+    return "\n" + textwrap.indent(response, " " * 8)
+
+
+# Stands in for a ticket which the project management client found, where the test never reads its content
+_TICKET_SENTINEL = object()
+
+# The workflow steps which *run* calls, stubbed together by the *run_stubs* fixture
+_RUN_WORKFLOW_STEPS = (
+    "is_branch_outdated",
+    "is_pr_already_opened",
+    "fetch_and_merge_latest_from_base_branch",
+    "get_branch_commits",
+    "extract_ticket_id",
+    "get_ticket_details",
+    "prepare_ai_prompt",
+    "_parse_ai_response_title",
+    "_parse_ai_response_body",
+)
+
+# The client initializers don't depend on the agent's state, so one spy agent serves all tests calling them
+_SPY_AGENT = SpyAgent()
+
+# A client type which no AI client supports
+_UNSUPPORTED_CLIENT = cast(AiModuleClient, "unsupported")
+# A tool type which no project management client supports
+_UNSUPPORTED_TOOL = cast(ProjectManagementToolType, "unsupported")
+# A missing ticket ID, passed where the signature expects a string
+_NONE_STR = cast(str, None)
+
+
+# The spec introspection is the costly part of creating the collaborator mocks, so each test class creates them once
+# and the *_reset_mocks* fixture restores their default behaviour around every test.
+@pytest.fixture(scope="class")
+def mock_git_handler() -> MagicMock:
+    """Create a mock GitHandler for testing."""
+    return cast(MagicMock, create_autospec(GitHandler, instance=True))
+
+
+@pytest.fixture(scope="class")
+def mock_github_operations() -> MagicMock:
+    """Create a mock GitHubOperations for testing."""
+    return cast(MagicMock, create_autospec(GitHubOperations, instance=True))
+
+
+@pytest.fixture(scope="class")
+def mock_pull_request() -> MagicMock:
+    """Create a mock PullRequest which the mocked GitHubOperations creates."""
+    mock = cast(MagicMock, create_autospec(PullRequest, instance=True))
+    mock.number = 123
+    mock.html_url = _PR_HTML_URL
+    return mock
+
+
+@pytest.fixture(scope="class")
+def mock_project_management_client() -> MagicMock:
+    """Create a mock project management client for testing."""
+    return cast(MagicMock, create_autospec(ClickUpAPIClient, instance=True))
+
+
+@pytest.fixture(scope="class")
+def mock_ai_client() -> MagicMock:
+    """Create a mock AI client for testing."""
+    return cast(MagicMock, create_autospec(GPTClient, instance=True))
+
+
 class TestPullRequestAIAgent:
     """Test cases for PullRequestAIAgent class."""
 
-    @pytest.fixture
-    def mock_git_handler(self) -> MagicMock:
-        """Create a mock GitHandler for testing."""
-        mock = MagicMock(spec=GitHandler)
-
+    @pytest.fixture(autouse=True)
+    def _reset_mocks(
+        self,
+        mock_git_handler: MagicMock,
+        mock_github_operations: MagicMock,
+        mock_project_management_client: MagicMock,
+        mock_ai_client: MagicMock,
+        mock_pull_request: MagicMock,
+    ) -> Iterator[None]:
+        """Set up the default behaviour of the class-scoped mocks for a test, and reset them after it."""
         # Setup active branch
-        mock._get_current_branch.return_value = "feature-branch"
+        mock_git_handler._get_current_branch.return_value = "feature-branch"
 
         # Setup commit details
-        mock_commit = {
-            "hash": "1234567890abcdef1234567890abcdef12345678",
-            "short_hash": "1234567",
-            "author": {"name": "Test Author", "email": "test@example.com"},
-            "committer": {"name": "Test Author", "email": "test@example.com"},
-            "message": "Test commit message",
-            "committed_date": 1620000000,
-            "authored_date": 1620000000,
-        }
-        mock.get_branch_head_commit_details.return_value = mock_commit
+        mock_git_handler.get_branch_head_commit_details.return_value = _MOCK_COMMIT
 
         # Setup repo
-        mock_repo = MagicMock()
-        type(mock).repo = PropertyMock(return_value=mock_repo)
+        mock_git_handler.repo = MagicMock()
 
         # Setup is_branch_outdated
-        mock.is_branch_outdated.return_value = False
-
-        return mock
-
-    @pytest.fixture
-    def mock_github_operations(self) -> MagicMock:
-        """Create a mock GitHubOperations for testing."""
-        mock = MagicMock(spec=GitHubOperations)
+        mock_git_handler.is_branch_outdated.return_value = False
 
         # Setup get_pull_request_by_branch
-        mock.get_pull_request_by_branch.return_value = None
+        mock_github_operations.get_pull_request_by_branch.return_value = None
 
         # Setup create_pull_request
-        mock_pr = MagicMock(spec=PullRequest)
-        mock_pr.number = 123
-        mock_pr.html_url = "https://github.com/owner/repo/pull/123"
-        mock.create_pull_request.return_value = mock_pr
-
-        return mock
-
-    @pytest.fixture
-    def mock_project_management_client(self) -> MagicMock:
-        """Create a mock project management client for testing."""
-        mock = MagicMock(spec=ClickUpAPIClient)
+        mock_github_operations.create_pull_request.return_value = mock_pull_request
 
         # Setup get_ticket
-        mock_ticket = MagicMock(spec=BaseImmutableModel)
-        mock_ticket.id = "123456"
-        mock_ticket.name = "Test ticket"
-        mock_ticket.text_content = "Test ticket description"
-        mock_ticket.description = None
+        mock_ticket = SimpleNamespace(
+            id="123456",
+            name="Test ticket",
+            text_content="Test ticket description",
+            description=None,
+            # Status as a nested object
+            status=SimpleNamespace(status="In Progress", color="#4A90E2"),
+        )
+        mock_project_management_client.get_ticket.return_value = mock_ticket
 
-        # Mock status as a nested object
-        mock_status = MagicMock()
-        mock_status.status = "In Progress"
-        mock_status.color = "#4A90E2"
-        mock_ticket.status = mock_status
+        # Setup get_content
+        mock_ai_client.get_content.return_value = _AI_RESPONSE_TITLE_BODY
 
-        mock.get_ticket.return_value = mock_ticket
+        yield
 
-        return mock
+        for mock in (
+            mock_git_handler,
+            mock_github_operations,
+            mock_project_management_client,
+            mock_ai_client,
+            mock_pull_request,
+        ):
+            _reset_spec_mock(mock)
 
     @pytest.fixture
-    def mock_ai_client(self) -> MagicMock:
-        """Create a mock AI client for testing."""
-        mock = MagicMock(spec=GPTClient)
-
-        # Setup get_content
-        mock.get_content.return_value = """
-        TITLE: Test PR title
-
-        BODY:
-        This is a test PR description.
-        It includes multiple lines.
-        """
-
-        return mock
+    def mock_create_pull_request(self, mock_github_operations: MagicMock) -> MagicMock:
+        """Get the create_pull_request mock of the mocked GitHubOperations once for the assertions of a test."""
+        return mock_github_operations.create_pull_request
 
     @pytest.fixture
     def bot(
@@ -145,50 +279,53 @@ class TestPullRequestAIAgent:
         mock_project_management_client: MagicMock,
     ) -> PullRequestAIAgent:
         """Create a PullRequestAIAgent instance with mocked dependencies."""
-        with (
-            patch("pull_request_ai_agent.bot.GitHandler", return_value=mock_git_handler),
-            patch("pull_request_ai_agent.bot.GitHubOperations", return_value=mock_github_operations),
-            patch.object(PullRequestAIAgent, "_initialize_ai_client", return_value=mock_ai_client),
-            patch.object(
-                PullRequestAIAgent, "_initialize_project_management_client", return_value=mock_project_management_client
-            ),
-        ):
-
-            bot = PullRequestAIAgent(
-                repo_path="/mock/repo",
-                base_branch="main",
-                github_token="mock-token",
-                github_repo="owner/repo",
-                project_management_tool_type=ProjectManagementToolType.CLICKUP,
-                project_management_tool_config=ProjectManagementToolSettings(api_key="mock-api-key"),
-                ai_client_type=AiModuleClient.GPT,
-                ai_client_api_key="mock-api-key",
-            )
-
-            return bot
-
-    def test_initialize_ai_client_gpt(self) -> None:
-        """Test initialization of GPT AI client."""
-        with patch("pull_request_ai_agent.bot.GPTClient") as mock_gpt_client:
-            SpyAgent()._initialize_ai_client(AiModuleClient.GPT, "mock-api-key")
-            mock_gpt_client.assert_called_once_with(api_key="mock-api-key")
+        bot = SpyAgent(
+            repo_path="/mock/repo",
+            base_branch="main",
+            github_token="mock-token",
+            github_repo="owner/repo",
+            project_management_tool_type=ProjectManagementToolType.CLICKUP,
+            project_management_tool_config=ProjectManagementToolSettings(api_key="mock-api-key"),
+            ai_client_type=AiModuleClient.GPT,
+            ai_client_api_key="mock-api-key",
+        )
+        bot.git_handler = mock_git_handler
+        bot.github_operations = mock_github_operations
+        bot.ai_client = mock_ai_client
+        bot.project_management_client = mock_project_management_client
+        return bot
 
-    def test_initialize_ai_client_claude(self) -> None:
-        """Test initialization of Claude AI client."""
-        with patch("pull_request_ai_agent.bot.ClaudeClient") as mock_claude_client:
-            SpyAgent()._initialize_ai_client(AiModuleClient.CLAUDE, "mock-api-key")
-            mock_claude_client.assert_called_once_with(api_key="mock-api-key")
+    @pytest.fixture
+    def bot_minimal(self, mock_git_handler: MagicMock, mock_ai_client: MagicMock) -> PullRequestAIAgent:
+        """Create a PullRequestAIAgent instance with only the git handler and AI client wired."""
+        bot = SpyAgent(
+            repo_path="/mock/repo",
+            base_branch="main",
+            ai_client_type=AiModuleClient.GPT,
+            ai_client_api_key="mock-api-key",
+        )
+        bot.git_handler = mock_git_handler
+        bot.ai_client = mock_ai_client
+        return bot
 
-    def test_initialize_ai_client_gemini(self) -> None:
-        """Test initialization of Gemini AI client."""
-        with patch("pull_request_ai_agent.bot.GeminiClient") as mock_gemini_client:
-            SpyAgent()._initialize_ai_client(AiModuleClient.GEMINI, "mock-api-key")
-            mock_gemini_client.assert_called_once_with(api_key="mock-api-key")
+    @pytest.mark.parametrize(
+        ("client_type", "client_class_name"),
+        [
+            (AiModuleClient.GPT, "GPTClient"),
+            (AiModuleClient.CLAUDE, "ClaudeClient"),
+            (AiModuleClient.GEMINI, "GeminiClient"),
+        ],
+    )
+    def test_initialize_ai_client(self, client_type: AiModuleClient, client_class_name: str) -> None:
+        """Test initialization of each supported AI client."""
+        with swap_attr(bot_module, client_class_name, MagicMock()) as mock_ai_client:
+            _SPY_AGENT._initialize_ai_client(client_type, "mock-api-key")
+            mock_ai_client.assert_called_once_with(api_key="mock-api-key")
 
     def test_initialize_ai_client_unsupported(self) -> None:
         """Test initialization with unsupported AI client type."""
         with pytest.raises(ValueError, match="Unsupported AI client type"):
-            SpyAgent()._initialize_ai_client(cast(AiModuleClient, "unsupported"), "mock-api-key")
+            _SPY_AGENT._initialize_ai_client(_UNSUPPORTED_CLIENT, "mock-api-key")
 
     def test_get_current_branch(self, bot: PullRequestAIAgent, mock_git_handler: MagicMock) -> None:
         """Test _get_current_branch method."""
@@ -216,16 +353,15 @@ class TestPullRequestAIAgent:
 
     def test_is_pr_already_opened_exists(self, bot: PullRequestAIAgent, mock_github_operations: MagicMock) -> None:
         """Test is_pr_already_opened method when PR exists."""
-        mock_pr = MagicMock(spec=PullRequest)
+        mock_pr = SimpleNamespace(number=123)
         mock_github_operations.get_pull_request_by_branch.return_value = mock_pr
 
         result = bot.is_pr_already_opened("test-branch")
         assert result
 
-    def test_is_pr_already_opened_no_github_ops(self, bot: PullRequestAIAgent) -> None:
+    def test_is_pr_already_opened_no_github_ops(self, bot_minimal: PullRequestAIAgent) -> None:
         """Test is_pr_already_opened method with no GitHub operations."""
-        bot.github_operations = None
-        result = bot.is_pr_already_opened("test-branch")
+        result = bot_minimal.is_pr_already_opened("test-branch")
         assert not result
 
     def test_is_pr_already_opened_exception(self, bot: PullRequestAIAgent, mock_github_operations: MagicMock) -> None:
@@ -254,45 +390,42 @@ class TestPullRequestAIAgent:
         with pytest.raises(GitCodeConflictError):
             bot.fetch_and_merge_latest_from_base_branch("test-branch")
 
-    def test_get_branch_commits(self, bot: PullRequestAIAgent, mock_git_handler: MagicMock) -> None:
+    @pytest.fixture
+    def branch_refs(self) -> SimpleNamespace:
+        """Create the git references of the feature branch and the base branch."""
+        return SimpleNamespace(feature=SimpleNamespace(name="test-branch"), base=SimpleNamespace(name="main"))
+
+    def test_get_branch_commits(
+        self, bot: PullRequestAIAgent, mock_git_handler: MagicMock, branch_refs: SimpleNamespace
+    ) -> None:
         """Test get_branch_commits method."""
         # Setup mock repo and commits
         mock_repo = mock_git_handler.repo
 
         # Create mock commit objects
-        mock_commit1 = MagicMock()
-        mock_commit1.hexsha = "abcdef1"
-        mock_commit1.author.name = "Author 1"
-        mock_commit1.author.email = "author1@example.com"
-        mock_commit1.committer.name = "Committer 1"
-        mock_commit1.committer.email = "committer1@example.com"
-        mock_commit1.message = "Commit message 1"
-        mock_commit1.committed_date = 1620000001
-        mock_commit1.authored_date = 1620000001
-
-        mock_commit2 = MagicMock()
-        mock_commit2.hexsha = "abcdef2"
-        mock_commit2.author.name = "Author 2"
-        mock_commit2.author.email = "author2@example.com"
-        mock_commit2.committer.name = "Committer 2"
-        mock_commit2.committer.email = "committer2@example.com"
-        mock_commit2.message = "Commit message 2"
-        mock_commit2.committed_date = 1620000002
-        mock_commit2.authored_date = 1620000002
-
-        # Mock base commit
-        mock_base_commit = MagicMock()
-        mock_base_commit.hexsha = "base123"
+        mock_commit1 = SimpleNamespace(
+            hexsha="abcdef1",
+            author=SimpleNamespace(name="Author 1", email="author1@example.com"),
+            committer=SimpleNamespace(name="Committer 1", email="committer1@example.com"),
+            message="Commit message 1",
+            committed_date=1620000001,
+            authored_date=1620000001,
+        )
 
-        # Setup refs
-        mock_feature_ref = MagicMock()
-        mock_feature_ref.name = "test-branch"
+        mock_commit2 = SimpleNamespace(
+            hexsha="abcdef2",
+            author=SimpleNamespace(name="Author 2", email="author2@example.com"),
+            committer=SimpleNamespace(name="Committer 2", email="committer2@example.com"),
+            message="Commit message 2",
+            committed_date=1620000002,
+            authored_date=1620000002,
+        )
 
-        mock_base_ref = MagicMock()
-        mock_base_ref.name = "main"
+        # Mock base commit
+        mock_base_commit = SimpleNamespace(hexsha="base123")
 
         # Set up repo.refs
-        mock_repo.refs = [mock_feature_ref, mock_base_ref]
+        mock_repo.refs = [branch_refs.feature, branch_refs.base]
 
         # Setup merge_base
         mock_repo.merge_base.return_value = [mock_base_commit]
@@ -312,19 +445,14 @@ class TestPullRequestAIAgent:
         assert commits[0]["hash"] == "abcdef1"
         assert commits[1]["hash"] == "abcdef2"
 
-    def test_get_branch_commits_no_commits(self, bot: PullRequestAIAgent, mock_git_handler: MagicMock) -> None:
+    def test_get_branch_commits_no_commits(
+        self, bot: PullRequestAIAgent, mock_git_handler: MagicMock, branch_refs: SimpleNamespace
+    ) -> None:
         """Test get_branch_commits method with no commits."""
         mock_repo = mock_git_handler.repo
 
-        # Setup refs
-        mock_feature_ref = MagicMock()
-        mock_feature_ref.name = "test-branch"
-
-        mock_base_ref = MagicMock()
-        mock_base_ref.name = "main"
-
         # Set up repo.refs
-        mock_repo.refs = [mock_feature_ref, mock_base_ref]
+        mock_repo.refs = [branch_refs.feature, branch_refs.base]
 
         mock_repo.merge_base.return_value = []
 
@@ -336,15 +464,13 @@ class TestPullRequestAIAgent:
         assert commits == []
 
     def test_get_branch_commits_feature_branch_not_found(
-        self, bot: PullRequestAIAgent, mock_git_handler: MagicMock
+        self, bot: PullRequestAIAgent, mock_git_handler: MagicMock, branch_refs: SimpleNamespace
     ) -> None:
         """Test get_branch_commits method when feature branch doesn't exist."""
         mock_repo = mock_git_handler.repo
 
         # Setup refs with only base branch
-        mock_base_ref = MagicMock()
-        mock_base_ref.name = "main"
-        mock_repo.refs = [mock_base_ref]
+        mock_repo.refs = [branch_refs.base]
 
         # Expect ValueError to be raised
         with pytest.raises(ValueError) as excinfo:
@@ -354,15 +480,13 @@ class TestPullRequestAIAgent:
         assert "Feature branch 'test-branch' not found" in str(excinfo.value)
 
     def test_get_branch_commits_base_branch_not_found(
-        self, bot: PullRequestAIAgent, mock_git_handler: MagicMock
+        self, bot: PullRequestAIAgent, mock_git_handler: MagicMock, branch_refs: SimpleNamespace
     ) -> None:
         """Test get_branch_commits method when base branch doesn't exist."""
         mock_repo = mock_git_handler.repo
 
         # Setup refs with only feature branch
-        mock_feature_ref = MagicMock()
-        mock_feature_ref.name = "test-branch"
-        mock_repo.refs = [mock_feature_ref]
+        mock_repo.refs = [branch_refs.feature]
 
         # Expect ValueError to be raised
         with pytest.raises(ValueError) as excinfo:
@@ -371,27 +495,23 @@ class TestPullRequestAIAgent:
         # Verify error message contains branch name
         assert "Base branch 'main' not found" in str(excinfo.value)
 
+    @pytest.mark.parametrize("separator", ["/", "_"], ids=["slash", "underline"])
     @pytest.mark.parametrize(
-        ("git_branch", "expected_ticket_id"),
+        ("prefix", "suffix", "expected_ticket_id"),
         [
-            # separate by slash */*
-            ("#123/fix_bug", "#123"),
-            ("PROJ-456/implement_feature", "PROJ-456"),
-            ("CU-abc123/update-docs", "CU-abc123"),
-            ("Task-789/refactor-code", "Task-789"),
-            ("no-ticket/just-test", ""),
-            # separate by underline *_*
-            ("#123_fix_bug", "#123"),
-            ("PROJ-456_implement_feature", "PROJ-456"),
-            ("CU-abc123_update-docs", "CU-abc123"),
-            ("Task-789_refactor-code", "Task-789"),
-            ("no-ticket_just-test", ""),
+            ("#123", "fix_bug", "#123"),
+            ("PROJ-456", "implement_feature", "PROJ-456"),
+            ("CU-abc123", "update-docs", "CU-abc123"),
+            ("Task-789", "refactor-code", "Task-789"),
+            ("no-ticket", "just-test", ""),
         ],
     )
-    def test_extract_ticket_id(self, bot: PullRequestAIAgent, git_branch: str, expected_ticket_id: str) -> None:
+    def test_extract_ticket_id(
+        self, bot: PullRequestAIAgent, separator: str, prefix: str, suffix: str, expected_ticket_id: str
+    ) -> None:
         """Test extract_ticket_id method."""
-        # Create test commits with various ticket patterns
-        ticket_id = bot.extract_ticket_id(git_branch)
+        # Build the git branch name with the ticket pattern and the separator
+        ticket_id = bot.extract_ticket_id(f"{prefix}{separator}{suffix}")
 
         # Verify extracted ticket IDs
         assert ticket_id == expected_ticket_id
@@ -408,23 +528,20 @@ class TestPullRequestAIAgent:
         # Verify get_ticket was called with formatted ticket IDs
         assert mock_project_management_client.get_ticket.call_count >= 2
 
-        # Check that get_ticket was called with the expected arguments (using any_order=True)
+        # Check that get_ticket was called with the expected arguments in one pass over the recorded calls
         # This is more robust than checking exact call sequence, as it ignores any __str__ calls
-        mock_project_management_client.get_ticket.assert_any_call("123456")
-        mock_project_management_client.get_ticket.assert_any_call("789012")
+        called_ticket_ids = {c.args[0] for c in mock_project_management_client.get_ticket.call_args_list}
+        assert {"123456", "789012"} <= called_ticket_ids
 
         # Verify returned tickets
         assert len(tickets) == 2
         assert tickets[0] is mock_project_management_client.get_ticket.return_value
         assert tickets[1] is mock_project_management_client.get_ticket.return_value
 
-    def test_get_ticket_details_no_client(self, bot: PullRequestAIAgent) -> None:
+    def test_get_ticket_details_no_client(self, bot_minimal: PullRequestAIAgent) -> None:
         """Test get_ticket_details method with no project management client."""
-        # Set project management client to None
-        bot.project_management_client = None
-
         # Call get_ticket_details
-        tickets = bot.get_ticket_details(["PROJ-123", "PROJ-456"])
+        tickets = bot_minimal.get_ticket_details(["PROJ-123", "PROJ-456"])
 
         # Should return empty list
         assert tickets == []
@@ -455,121 +572,76 @@ class TestPullRequestAIAgent:
         bot.project_management_tool_type = ProjectManagementToolType.CLICKUP
 
         # Mock get_ticket to return None for one ticket
-        mock_project_management_client.get_ticket.side_effect = [None, MagicMock()]
+        mock_project_management_client.get_ticket.side_effect = [None, _TICKET_SENTINEL]
 
         # Call get_ticket_details
         tickets = bot.get_ticket_details(["CU-123", "CU-456"])
 
         # Should only include the non-None ticket
-        assert len(tickets) == 1
+        assert tickets == [_TICKET_SENTINEL]
 
-    def test_prepare_ai_prompt(self, bot: PullRequestAIAgent) -> None:
-        """Test prepare_ai_prompt method."""
-        # Mock commits and tickets
-        commits = [
-            {"short_hash": "abc123", "message": "Fix bug in login form", "author": "John Doe", "date": "2023-01-01"},
-            {"short_hash": "def456", "message": "Add new feature", "author": "Jane Smith", "date": "2023-01-02"},
-        ]
+    @pytest.fixture
+    def mocked_extract_info(self, bot: PullRequestAIAgent) -> Iterator[MagicMock]:
+        """Replace _extract_ticket_info of the agent with a mock returning the standard ticket info."""
+        with swap_attr(bot, "_extract_ticket_info", MagicMock(return_value=_STANDARD_TICKET_INFO)) as mock:
+            yield mock
 
-        # Create mock tickets with the new structure
-        mock_ticket1 = MagicMock()
-        mock_ticket2 = MagicMock()
+    @pytest.mark.parametrize(
+        ("commits", "tickets_count"),
+        [
+            pytest.param(_FULL_COMMITS, 2, id="commits_and_tickets"),
+            pytest.param(_ONE_COMMIT, 0, id="no_tickets"),
+            pytest.param([], 1, id="no_commits"),
+        ],
+    )
+    def test_prepare_ai_prompt(
+        self,
+        bot: PullRequestAIAgent,
+        mocked_extract_info: MagicMock,
+        commits: List[Dict[str, Any]],
+        tickets_count: int,
+    ) -> None:
+        """Test prepare_ai_prompt method."""
+        # Create stub tickets, whose content comes from the patched _extract_ticket_info
+        tickets = [cast(BaseImmutableModel, object()) for _ in range(tickets_count)]
 
         # Set up _extract_ticket_info to return structured ticket info
-        with patch.object(bot, "_extract_ticket_info") as mock_extract_info:
-            mock_extract_info.side_effect = [
-                {
-                    "id": "PROJ-123",
-                    "title": "Fix login bug",
-                    "description": "The login form has a bug that needs to be fixed",
-                    "status": "In Progress",
-                },
-                {
-                    "id": "PROJ-456",
-                    "title": "Implement new feature",
-                    "description": "Add a new feature to the application",
-                    "status": "In Review",
-                },
-            ]
-
-            # Call prepare_ai_prompt
-            prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket1, mock_ticket2])
-
-            # Verify _extract_ticket_info was called
-            assert mock_extract_info.call_count == 2
-            mock_extract_info.assert_has_calls([call(mock_ticket1), call(mock_ticket2)])
-
-        # Verify prompt_data is a PRPromptData object
-        assert hasattr(prompt_data, "title")
-        assert hasattr(prompt_data, "description")
+        mocked_extract_info.side_effect = _TICKET_INFOS[:tickets_count]
 
-    def test_prepare_ai_prompt_no_tickets(self, bot: PullRequestAIAgent) -> None:
-        """Test prepare_ai_prompt method with no tickets."""
-        # Mock commits
-        commits = [
-            {"short_hash": "abc123", "message": "Fix bug in login form", "author": "John Doe", "date": "2023-01-01"}
-        ]
+        # Call prepare_ai_prompt
+        prompt_data = bot.prepare_ai_prompt(commits, tickets)
 
-        # Call prepare_ai_prompt with empty tickets list
-        prompt_data = bot.prepare_ai_prompt(commits, [])
+        # Verify _extract_ticket_info was called for every ticket
+        assert mocked_extract_info.call_count == tickets_count
+        mocked_extract_info.assert_has_calls([call(ticket) for ticket in tickets])
 
         # Verify prompt_data is a PRPromptData object
         assert hasattr(prompt_data, "title")
         assert hasattr(prompt_data, "description")
 
-    def test_prepare_ai_prompt_no_commits(self, bot: PullRequestAIAgent) -> None:
-        """Test prepare_ai_prompt method with no commits."""
-        # Create mock ticket
-        mock_ticket = MagicMock()
-
-        # Set up _extract_ticket_info to return structured ticket info
-        with patch.object(bot, "_extract_ticket_info") as mock_extract_info:
-            mock_extract_info.return_value = {
-                "id": "PROJ-123",
-                "title": "Fix login bug",
-                "description": "The login form has a bug that needs to be fixed",
-                "status": "In Progress",
-            }
-
-            # Call prepare_ai_prompt with empty commits list
-            prompt_data = bot.prepare_ai_prompt([], [mock_ticket])
-
-        # Verify prompt_data is a PRPromptData object
-        assert hasattr(prompt_data, "title")
-        assert hasattr(prompt_data, "description")
-
-    def test_parse_ai_response_title(self, bot: PullRequestAIAgent) -> None:
+    @pytest.mark.parametrize(
+        "response",
+        [
+            pytest.param(_AI_RESPONSE_TITLE_BODY, id="dedented"),
+            pytest.param(_indented(_AI_RESPONSE_TITLE_BODY), id="indented"),
+        ],
+    )
+    def test_parse_ai_response_title(self, bot: PullRequestAIAgent, response: str) -> None:
         """Test _parse_ai_response_title method."""
         # Test with well-formatted response
-        response = """
-        TITLE: This is the PR title
-
-        BODY:
-        This is the PR body.
-        It spans multiple lines.
-        """
-
         title = bot._parse_ai_response_title(response)
 
-        assert "This is the PR title" in title
+        assert "Test PR title" in title
 
-    def test_parse_ai_response_body(self, bot: PullRequestAIAgent) -> None:
+    @pytest.mark.parametrize(
+        "response",
+        [
+            pytest.param(_AI_RESPONSE_MARKDOWN, id="dedented"),
+            pytest.param(_indented(_AI_RESPONSE_MARKDOWN), id="indented"),
+        ],
+    )
+    def test_parse_ai_response_body(self, bot: PullRequestAIAgent, response: str) -> None:
         """Test _parse_ai_response_body method."""
-        response = """
-        Here's the PR description:
-
-        ```markdown
-        ## _Target_
-
-        * ### Task summary:
-            This is the PR body.
-            It spans multiple lines.
-
-        * ### Task tickets:
-            * Task ID: TEST-123
-        ```
-        """
-
         body = bot._parse_ai_response_body(response)
 
         assert "## _Target_" in body
@@ -578,355 +650,272 @@ class TestPullRequestAIAgent:
 
     def test_parse_ai_response_body_no_markdown(self, bot: PullRequestAIAgent) -> None:
         """Test _parse_ai_response_body method with no markdown content."""
-        response = """
-        This is just some text without any formatting.
-        """
-
-        body = bot._parse_ai_response_body(response)
+        body = bot._parse_ai_response_body("This is just some text without any formatting.\n")
 
         # When no markdown is found, the method returns an empty string
         assert body == ""
 
-    def test_create_pull_request(self, bot: PullRequestAIAgent, mock_github_operations: MagicMock) -> None:
+    def test_create_pull_request(self, bot: PullRequestAIAgent, mock_create_pull_request: MagicMock) -> None:
         """Test create_pull_request method."""
         pr = bot.create_pull_request(title="Test PR", body="Test PR description", branch_name="feature-branch")
 
         # Verify create_pull_request was called
-        mock_github_operations.create_pull_request.assert_called_once_with(
+        mock_create_pull_request.assert_called_once_with(
             title="Test PR", body="Test PR description", base_branch="main", head_branch="feature-branch"
         )
 
         # Verify returned PR
         assert pr is not None
         assert getattr(pr, "number", None) == 123
-        assert getattr(pr, "html_url", None) == "https://github.com/owner/repo/pull/123"
+        assert getattr(pr, "html_url", None) == _PR_HTML_URL
 
-    def test_create_pull_request_no_github_ops(self, bot: PullRequestAIAgent) -> None:
+    def test_create_pull_request_no_github_ops(self, bot_minimal: PullRequestAIAgent) -> None:
         """Test create_pull_request method with no GitHub operations."""
-        bot.github_operations = None
-
-        pr = bot.create_pull_request(title="Test PR", body="Test PR description")
+        pr = bot_minimal.create_pull_request(title="Test PR", body="Test PR description")
 
         # Should return None
         assert pr is None
 
-    def test_create_pull_request_exception(self, bot: PullRequestAIAgent, mock_github_operations: MagicMock) -> None:
+    def test_create_pull_request_exception(self, bot: PullRequestAIAgent, mock_create_pull_request: MagicMock) -> None:
         """Test create_pull_request method with exception."""
-        mock_github_operations.create_pull_request.side_effect = Exception("Test error")
+        mock_create_pull_request.side_effect = Exception("Test error")
 
         pr = bot.create_pull_request(title="Test PR", body="Test PR description")
 
         # Should return None
         assert pr is None
 
-    def test_run_outdated_pr_exists(self, bot: PullRequestAIAgent) -> None:
-        """Test run method when branch is outdated and PR exists."""
-        # Mock is_branch_outdated and is_pr_already_opened
-        with (
-            patch.object(bot, "is_branch_outdated", return_value=True),
-            patch.object(bot, "is_pr_already_opened", return_value=True),
-        ):
-
-            # Call run
-            result = bot.run()
-
-            # Verify no PR was created
-            assert result is None
+    @pytest.fixture
+    def run_stubs(self, bot: PullRequestAIAgent) -> Iterator[SimpleNamespace]:
+        """Stub every workflow step which *run* calls, defaulting to the happy path of an up-to-date branch."""
+        stubs = SimpleNamespace(**{name: MagicMock() for name in _RUN_WORKFLOW_STEPS})
+        for name in _RUN_WORKFLOW_STEPS:
+            setattr(bot, name, getattr(stubs, name))
+
+        stubs.is_branch_outdated.return_value = False
+        stubs.is_pr_already_opened.return_value = False
+        stubs.get_branch_commits.return_value = [{"message": "Test commit"}]
+        stubs.extract_ticket_id.return_value = "PROJ-123"
+        stubs._parse_ai_response_title.return_value = "Test title"
+        stubs._parse_ai_response_body.return_value = "Test body"
+        yield stubs
 
-    def test_run_outdated_no_pr(
+    @pytest.mark.parametrize(
+        ("outdated", "pr_exists", "conflict", "has_commits", "ai_fails", "expect_pr"),
+        [
+            pytest.param(True, True, False, True, False, False, id="outdated_pr_exists"),
+            pytest.param(True, False, False, True, False, True, id="outdated_no_pr"),
+            pytest.param(False, False, False, True, False, True, id="up_to_date_no_pr"),
+            pytest.param(True, False, True, True, False, False, id="merge_conflict"),
+            pytest.param(False, False, False, False, False, False, id="no_commits"),
+            pytest.param(False, False, False, True, True, True, id="ai_failure"),
+        ],
+    )
+    def test_run(
         self,
         bot: PullRequestAIAgent,
-        mock_git_handler: MagicMock,
+        run_stubs: SimpleNamespace,
         mock_ai_client: MagicMock,
-        mock_github_operations: MagicMock,
+        mock_create_pull_request: MagicMock,
+        outdated: bool,
+        pr_exists: bool,
+        conflict: bool,
+        has_commits: bool,
+        ai_fails: bool,
+        expect_pr: bool,
     ) -> None:
-        """Test run method when branch is outdated and no PR exists."""
-        # Mock methods
-        with (
-            patch.object(bot, "is_branch_outdated", return_value=True),
-            patch.object(bot, "is_pr_already_opened", return_value=False),
-            patch.object(bot, "fetch_and_merge_latest_from_base_branch", return_value=True),
-            patch.object(bot, "get_branch_commits", return_value=[{"message": "Test commit"}]),
-            patch.object(bot, "extract_ticket_id", return_value=["PROJ-123"]),
-            patch.object(bot, "get_ticket_details", return_value=[MagicMock()]),
-            patch.object(bot, "prepare_ai_prompt", return_value=MagicMock()),
-            patch.object(bot, "_parse_ai_response_title", return_value="Test title"),
-            patch.object(bot, "_parse_ai_response_body", return_value="Test body"),
-        ):
-
-            # Call run
-            result = bot.run()
-
-            # Verify PR was created
-            assert result is not None
-            mock_github_operations.create_pull_request.assert_called_once()
-
-    def test_run_up_to_date_no_pr(self, bot: PullRequestAIAgent, mock_github_operations: MagicMock) -> None:
-        """Test run method when branch is up to date and no PR exists."""
-        # Mock methods
-        with (
-            patch.object(bot, "is_branch_outdated", return_value=False),
-            patch.object(bot, "is_pr_already_opened", return_value=False),
-            patch.object(bot, "get_branch_commits", return_value=[{"message": "Test commit"}]),
-            patch.object(bot, "extract_ticket_id", return_value=["PROJ-123"]),
-            patch.object(bot, "get_ticket_details", return_value=[MagicMock()]),
-            patch.object(bot, "prepare_ai_prompt", return_value=MagicMock()),
-            patch.object(bot, "_parse_ai_response_title", return_value="Test title"),
-            patch.object(bot, "_parse_ai_response_body", return_value="Test body"),
-        ):
-
-            # Call run
-            result = bot.run()
-
-            # Verify PR was created
-            assert result is not None
-            mock_github_operations.create_pull_request.assert_called_once()
-
-    def test_run_merge_conflict(self, bot: PullRequestAIAgent) -> None:
-        """Test run method with merge conflict."""
-        # Mock methods
-        with (
-            patch.object(bot, "is_branch_outdated", return_value=True),
-            patch.object(bot, "is_pr_already_opened", return_value=False),
-            patch.object(
-                bot, "fetch_and_merge_latest_from_base_branch", side_effect=GitCodeConflictError("Test conflict")
-            ),
-        ):
-
-            # Call run
-            result = bot.run()
-
-            # Verify no PR was created
-            assert result is None
-
-    def test_run_no_commits(self, bot: PullRequestAIAgent) -> None:
-        """Test run method with no commits."""
-        # Mock methods
-        with (
-            patch.object(bot, "is_branch_outdated", return_value=False),
-            patch.object(bot, "is_pr_already_opened", return_value=False),
-            patch.object(bot, "get_branch_commits", return_value=[]),
-        ):
-
-            # Call run
-            result = bot.run()
-
+        """Test run method over the states of the PR creation workflow."""
+        run_stubs.is_branch_outdated.return_value = outdated
+        run_stubs.is_pr_already_opened.return_value = pr_exists
+        if conflict:
+            run_stubs.fetch_and_merge_latest_from_base_branch.side_effect = GitCodeConflictError("Test conflict")
+        if not has_commits:
+            run_stubs.get_branch_commits.return_value = []
+        if ai_fails:
+            mock_ai_client.get_content.side_effect = Exception("AI error")
+
+        # Call run
+        result = bot.run()
+
+        if not expect_pr:
             # Verify no PR was created
             assert result is None
-
-    def test_run_ai_failure(
-        self, bot: PullRequestAIAgent, mock_ai_client: MagicMock, mock_github_operations: MagicMock
-    ) -> None:
-        """Test run method with AI failure."""
-        # Mock AI client to raise exception
-        mock_ai_client.get_content.side_effect = Exception("AI error")
-
-        # Mock methods
-        with (
-            patch.object(bot, "is_branch_outdated", return_value=False),
-            patch.object(bot, "is_pr_already_opened", return_value=False),
-            patch.object(bot, "get_branch_commits", return_value=[{"message": "Test commit"}]),
-            patch.object(bot, "extract_ticket_id", return_value=[]),
-            patch.object(bot, "get_ticket_details", return_value=[]),
-            patch.object(bot, "prepare_ai_prompt", return_value=MagicMock()),
-        ):
-
-            # Call run
-            result = bot.run()
-
-            # Verify PR was created with fallback content
-            assert result is not None
-            mock_github_operations.create_pull_request.assert_called_once()
-            title, body, branch = (
-                mock_github_operations.create_pull_request.call_args[1]["title"],
-                mock_github_operations.create_pull_request.call_args[1]["body"],
-                mock_github_operations.create_pull_request.call_args[1]["head_branch"],
-            )
-            assert title == f"Update {branch}"
-            assert body == "Automated pull request."
+            mock_create_pull_request.assert_not_called()
+            return
+
+        # Verify PR was created
+        assert result is not None
+        mock_create_pull_request.assert_called_once()
+        if ai_fails:
+            # Verify the PR falls back to generic content
+            kwargs = mock_create_pull_request.call_args.kwargs
+            assert kwargs["title"] == f"Update {kwargs['head_branch']}"
+            assert kwargs["body"] == "Automated pull request."
 
     def test_initialize_project_management_client_clickup(self) -> None:
         """Test initialization of ClickUp project management client."""
-        with patch("pull_request_ai_agent.bot.ClickUpAPIClient") as mock_clickup_client:
+        with swap_attr(bot_module, "ClickUpAPIClient", MagicMock()) as mock_clickup_client:
             config = ProjectManagementToolSettings(api_key="mock-api-token")
-            client = SpyAgent()._initialize_project_management_client(ProjectManagementToolType.CLICKUP, config)
+            client = _SPY_AGENT._initialize_project_management_client(ProjectManagementToolType.CLICKUP, config)
             mock_clickup_client.assert_called_once_with(api_token="mock-api-token")
 
     def test_initialize_project_management_client_jira(self) -> None:
         """Test initialization of Jira project management client."""
-        with patch("pull_request_ai_agent.bot.JiraAPIClient") as mock_jira_client:
+        with swap_attr(bot_module, "JiraAPIClient", MagicMock()) as mock_jira_client:
             config = ProjectManagementToolSettings(
                 base_url="https://example.atlassian.net", username="test@example.com", api_key="mock-api-token"
             )
-            client = SpyAgent()._initialize_project_management_client(ProjectManagementToolType.JIRA, config)
+            client = _SPY_AGENT._initialize_project_management_client(ProjectManagementToolType.JIRA, config)
             mock_jira_client.assert_called_once_with(
                 base_url="https://example.atlassian.net", email="test@example.com", api_token="mock-api-token"
             )
 
     @pytest.mark.parametrize(
-        ("service_type", "config"),
+        ("service_type", "settings_kwargs"),
         [
-            (ProjectManagementToolType.CLICKUP, ProjectManagementToolSettings()),
-            (
+            pytest.param(ProjectManagementToolType.CLICKUP, {}, id="clickup-missing-api-key"),
+            pytest.param(
                 ProjectManagementToolType.JIRA,
-                ProjectManagementToolSettings(username="test@example.com", api_key="mock-token"),
+                {"username": "test@example.com", "api_key": "mock-token"},
+                id="jira-missing-base-url",
             ),
-            (
+            pytest.param(
                 ProjectManagementToolType.JIRA,
-                ProjectManagementToolSettings(base_url="example.com", api_key="mock-token"),
+                {"base_url": "example.com", "api_key": "mock-token"},
+                id="jira-missing-username",
             ),
-            (
+            pytest.param(
                 ProjectManagementToolType.JIRA,
-                ProjectManagementToolSettings(base_url="example.com", username="test@example.com"),
+                {"base_url": "example.com", "username": "test@example.com"},
+                id="jira-missing-api-key",
             ),
         ],
     )
     def test_initialize_project_management_client_missing_config(
-        self, service_type: ProjectManagementToolType, config: ProjectManagementToolSettings
+        self, service_type: ProjectManagementToolType, settings_kwargs: Dict[str, Any]
     ) -> None:
-        # Test Jira with missing base_url
+        """Test initialization of project management client with missing required settings."""
+        config = ProjectManagementToolSettings(**settings_kwargs)
         with pytest.raises(ValueError, match="is required"):
-            SpyAgent()._initialize_project_management_client(service_type, config)
+            _SPY_AGENT._initialize_project_management_client(service_type, config)
 
     def test_initialize_project_management_client_unsupported(self) -> None:
         """Test initialization with unsupported project management tool type."""
         with pytest.raises(ValueError, match="Unsupported project management tool type"):
-            SpyAgent()._initialize_project_management_client(
-                cast(ProjectManagementToolType, "unsupported"), ProjectManagementToolSettings()
-            )
+            _SPY_AGENT._initialize_project_management_client(_UNSUPPORTED_TOOL, ProjectManagementToolSettings())
 
-    def test_format_ticket_id_clickup(self, bot: PullRequestAIAgent) -> None:
-        """Test _format_ticket_id method for ClickUp tickets."""
-        # Mock the project management tool type
-        bot.project_management_tool_type = ProjectManagementToolType.CLICKUP
-
-        # Test with CU- prefix
-        ticket_id = bot._format_ticket_id("CU-abc123")
-        assert ticket_id == "abc123"
-
-        # Test without prefix
-        ticket_id = bot._format_ticket_id("def456")
-        assert ticket_id == "def456"
-
-        # Test with whitespace
-        ticket_id = bot._format_ticket_id(" CU-ghi789 ")
-        assert ticket_id == "ghi789"
-
-    def test_format_ticket_id_jira(self, bot: PullRequestAIAgent) -> None:
-        """Test _format_ticket_id method for Jira tickets."""
-        # Mock the project management tool type
-        bot.project_management_tool_type = ProjectManagementToolType.JIRA
-
-        # Test with standard Jira format
-        ticket_id = bot._format_ticket_id("PROJ-123")
-        assert ticket_id == "PROJ-123"
-
-        # Test with whitespace
-        ticket_id = bot._format_ticket_id(" TEST-456 ")
-        assert ticket_id == "TEST-456"
-
-    def test_format_ticket_id_none(self, bot: PullRequestAIAgent) -> None:
-        """Test _format_ticket_id method with None input."""
-        ticket_id = bot._format_ticket_id(cast(str, None))
-        assert ticket_id is None
-
-    def test_format_ticket_id_unknown_tool(self, bot: PullRequestAIAgent) -> None:
-        """Test _format_ticket_id method with unknown tool type."""
-        # Set project management tool type to None
-        bot.project_management_tool_type = None
-
-        ticket_id = bot._format_ticket_id("TICKET-123")
-        assert ticket_id == "TICKET-123"
-
-    def test_extract_ticket_info_clickup(self, bot: PullRequestAIAgent) -> None:
-        """Test _extract_ticket_info method for ClickUp tickets."""
-        # Mock the project management tool type
-        bot.project_management_tool_type = ProjectManagementToolType.CLICKUP
-
-        # Create a mock ClickUp ticket
-        mock_ticket = MagicMock()
-        mock_ticket.id = "123456"
-        mock_ticket.name = "Test ClickUp ticket"
-        mock_ticket.text_content = "Test ticket text content"
-        mock_ticket.description = None
-
-        # Mock status as a nested object
-        mock_status = MagicMock()
-        mock_status.status = "In Progress"
-        mock_status.color = "#4A90E2"
-        mock_ticket.status = mock_status
-
-        # Extract ticket info
-        ticket_info = bot._extract_ticket_info(mock_ticket)
-
-        # Verify extracted info
-        assert ticket_info["id"] == "123456"
-        assert ticket_info["title"] == "Test ClickUp ticket"
-        assert ticket_info["description"] == "Test ticket text content"
-        assert ticket_info["status"] == "In Progress"
-
-    def test_extract_ticket_info_clickup_with_description(self, bot: PullRequestAIAgent) -> None:
-        """Test _extract_ticket_info method for ClickUp tickets with description instead of text_content."""
-        # Mock the project management tool type
-        bot.project_management_tool_type = ProjectManagementToolType.CLICKUP
-
-        # Create a mock ClickUp ticket
-        mock_ticket = MagicMock()
-        mock_ticket.id = "123456"
-        mock_ticket.name = "Test ClickUp ticket"
-        mock_ticket.text_content = None
-        mock_ticket.description = "Test ticket description"
-
-        # Extract ticket info
-        ticket_info = bot._extract_ticket_info(mock_ticket)
-
-        # Verify extracted info
-        assert ticket_info["description"] == "Test ticket description"
+    @pytest.mark.parametrize(
+        ("tool_type", "raw_ticket_id", "expected_ticket_id"),
+        [
+            pytest.param(ProjectManagementToolType.CLICKUP, "CU-abc123", "abc123", id="clickup-prefix"),
+            pytest.param(ProjectManagementToolType.CLICKUP, "def456", "def456", id="clickup-no-prefix"),
+            pytest.param(ProjectManagementToolType.CLICKUP, " CU-ghi789 ", "ghi789", id="clickup-whitespace"),
+            pytest.param(ProjectManagementToolType.JIRA, "PROJ-123", "PROJ-123", id="jira"),
+            pytest.param(ProjectManagementToolType.JIRA, " TEST-456 ", "TEST-456", id="jira-whitespace"),
+            pytest.param(ProjectManagementToolType.CLICKUP, _NONE_STR, None, id="none-input"),
+            pytest.param(None, "TICKET-123", "TICKET-123", id="unknown-tool"),
+        ],
+    )
+    def test_format_ticket_id(
+        self,
+        bot: PullRequestAIAgent,
+        tool_type: Optional[ProjectManagementToolType],
+        raw_ticket_id: str,
+        expected_ticket_id: Optional[str],
+    ) -> None:
+        """Test _format_ticket_id method for each project management tool type."""
+        bot.project_management_tool_type = tool_type
 
-    def test_extract_ticket_info_jira(self, bot: PullRequestAIAgent) -> None:
-        """Test _extract_ticket_info method for Jira tickets."""
-        # Mock the project management tool type
-        bot.project_management_tool_type = ProjectManagementToolType.JIRA
+        ticket_id = bot._format_ticket_id(raw_ticket_id)
+        assert ticket_id == expected_ticket_id
 
-        # Create a mock Jira ticket
-        mock_ticket = MagicMock()
-        mock_ticket.id = "PROJ-123"
-        mock_ticket.title = "Test Jira ticket"
-        mock_ticket.description = "Test Jira description"
-        mock_ticket.status = "In Review"
+    @pytest.mark.parametrize(
+        ("tool_type", "ticket_attrs", "expected_ticket_info"),
+        [
+            pytest.param(
+                ProjectManagementToolType.CLICKUP,
+                {
+                    "id": "123456",
+                    "name": "Test ClickUp ticket",
+                    "text_content": "Test ticket text content",
+                    "description": None,
+                    # Status as a nested object
+                    "status": SimpleNamespace(status="In Progress", color="#4A90E2"),
+                },
+                {
+                    "id": "123456",
+                    "title": "Test ClickUp ticket",
+                    "description": "Test ticket text content",
+                    "status": "In Progress",
+                },
+                id="clickup",
+            ),
+            pytest.param(
+                ProjectManagementToolType.CLICKUP,
+                {
+                    "id": "123456",
+                    "name": "Test ClickUp ticket",
+                    "text_content": None,
+                    "description": "Test ticket description",
+                },
+                {
+                    "id": "123456",
+                    "title": "Test ClickUp ticket",
+                    "description": "Test ticket description",
+                    "status": "",
+                },
+                id="clickup-with-description",
+            ),
+            pytest.param(
+                ProjectManagementToolType.JIRA,
+                {
+                    "id": "PROJ-123",
+                    "title": "Test Jira ticket",
+                    "description": "Test Jira description",
+                    "status": "In Review",
+                },
+                {
+                    "id": "PROJ-123",
+                    "title": "Test Jira ticket",
+                    "description": "Test Jira description",
+                    "status": "In Review",
+                },
+                id="jira",
+            ),
+            pytest.param(
+                None,
+                {
+                    "id": "TICKET-123",
+                    "name": "Test ticket name",
+                    "title": "Test ticket title",
+                    "description": "Test description",
+                    "status": "Open",
+                },
+                # Should use generic fallback, which prefers title over name
+                {"id": "TICKET-123", "title": "Test ticket title", "description": "Test description", "status": "Open"},
+                id="unknown-tool",
+            ),
+        ],
+    )
+    def test_extract_ticket_info(
+        self,
+        bot: PullRequestAIAgent,
+        tool_type: Optional[ProjectManagementToolType],
+        ticket_attrs: Dict[str, Any],
+        expected_ticket_info: Dict[str, str],
+    ) -> None:
+        """Test _extract_ticket_info method for each project management tool type."""
+        bot.project_management_tool_type = tool_type
 
         # Extract ticket info
-        ticket_info = bot._extract_ticket_info(mock_ticket)
+        ticket_info = bot._extract_ticket_info(cast(BaseImmutableModel, SimpleNamespace(**ticket_attrs)))
 
         # Verify extracted info
-        assert ticket_info["id"] == "PROJ-123"
-        assert ticket_info["title"] == "Test Jira ticket"
-        assert ticket_info["description"] == "Test Jira description"
-        assert ticket_info["status"] == "In Review"
-
-    def test_extract_ticket_info_unknown_tool(self, bot: PullRequestAIAgent) -> None:
-        """Test _extract_ticket_info method with unknown tool type."""
-        # Set project management tool type to None
-        bot.project_management_tool_type = None
-
-        # Create a mock ticket with various attributes
-        mock_ticket = MagicMock()
-        mock_ticket.id = "TICKET-123"
-        mock_ticket.name = "Test ticket name"
-        mock_ticket.title = "Test ticket title"
-        mock_ticket.description = "Test description"
-        mock_ticket.status = "Open"
-
-        # Extract ticket info
-        ticket_info = bot._extract_ticket_info(mock_ticket)
+        assert expected_ticket_info.items() <= ticket_info.items()
 
-        # Verify extracted info - should use generic fallback
-        assert ticket_info["id"] == "TICKET-123"
-        assert ticket_info["title"] == "Test ticket title"  # Should prefer title over name
-        assert ticket_info["description"] == "Test description"
-        assert ticket_info["status"] == "Open"
-
-    def test_prepare_ai_prompt_with_prompt_templates(self, bot: PullRequestAIAgent) -> None:
+    def test_prepare_ai_prompt_with_prompt_templates(
+        self, bot: PullRequestAIAgent, mocked_extract_info: MagicMock
+    ) -> None:
         """Test prepare_ai_prompt method using prompt templates."""
         # Mock commits and tickets
         commits = [
@@ -935,105 +924,78 @@ class TestPullRequestAIAgent:
         ]
 
         # Create mock tickets
-        mock_ticket1 = MagicMock()
-        mock_ticket2 = MagicMock()
+        mock_ticket1 = cast(BaseImmutableModel, object())
+        mock_ticket2 = cast(BaseImmutableModel, object())
 
         # Mock prepare_pr_prompt_data
-        mock_prompt_data = MagicMock()
-        mock_prompt_data.title = "Test title prompt"
-
-        with patch("pull_request_ai_agent.bot.prepare_pr_prompt_data", return_value=mock_prompt_data) as mock_prepare:
-            # Set up _extract_ticket_info to return structured ticket info
-            with patch.object(bot, "_extract_ticket_info") as mock_extract_info:
-                mock_extract_info.side_effect = [
-                    {
-                        "id": "PROJ-123",
-                        "title": "Fix login bug",
-                        "description": "The login form has a bug that needs to be fixed",
-                        "status": "In Progress",
-                    },
-                    {
-                        "id": "PROJ-456",
-                        "title": "Implement new feature",
-                        "description": "Add a new feature to the application",
-                        "status": "In Review",
-                    },
-                ]
-
-                # Call prepare_ai_prompt
-                prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket1, mock_ticket2])
-
-                # Verify _extract_ticket_info was called
-                assert mock_extract_info.call_count == 2
-
-                # Verify prepare_pr_prompt_data was called with the right arguments
-                mock_prepare.assert_called_once()
-                call_args = mock_prepare.call_args[1]
-                assert len(call_args["task_tickets_details"]) == 2
-                assert call_args["task_tickets_details"][0]["id"] == "PROJ-123"
-                assert call_args["task_tickets_details"][1]["id"] == "PROJ-456"
-                assert len(call_args["commits"]) == 2
-                assert call_args["commits"][0]["short_hash"] == "abc123"
-                assert call_args["commits"][1]["short_hash"] == "def456"
-
-                # Verify the returned prompt_data is the same as mock_prompt_data
-                assert prompt_data is mock_prompt_data
-
-    def test_prepare_ai_prompt_template_not_found(self, bot: PullRequestAIAgent) -> None:
-        """Test prepare_ai_prompt method when prompt template is not found."""
-        # Mock commits and tickets
-        commits = [{"short_hash": "abc123", "message": "Fix bug in login form"}]
+        mock_prompt_data = cast(PRPromptData, SimpleNamespace(title="Test title prompt"))
 
-        # Create mock ticket
-        mock_ticket = MagicMock()
+        with swap_attr(bot_module, "prepare_pr_prompt_data", MagicMock(return_value=mock_prompt_data)) as mock_prepare:
+            # Set up _extract_ticket_info to return the info of both tickets
+            mocked_extract_info.side_effect = _TICKET_INFOS
 
-        # Mock prepare_pr_prompt_data to raise FileNotFoundError
-        with patch("pull_request_ai_agent.bot.prepare_pr_prompt_data", side_effect=FileNotFoundError("Test error")):
-            # Set up _extract_ticket_info to return structured ticket info
-            with patch.object(bot, "_extract_ticket_info") as mock_extract_info:
-                mock_extract_info.return_value = {
-                    "id": "PROJ-123",
-                    "title": "Fix login bug",
-                    "description": "The login form has a bug that needs to be fixed",
-                    "status": "In Progress",
-                }
+            # Call prepare_ai_prompt
+            prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket1, mock_ticket2])
 
-                # Call prepare_ai_prompt should raise FileNotFoundError
-                with pytest.raises(FileNotFoundError):
-                    bot.prepare_ai_prompt(commits, [mock_ticket])
+            # Verify _extract_ticket_info was called
+            assert mocked_extract_info.call_count == 2
+
+            # Verify prepare_pr_prompt_data was called with the ticket info and the trimmed commits
+            mock_prepare.assert_called_once_with(
+                task_tickets_details=_TICKET_INFOS,
+                commits=[
+                    {"short_hash": "abc123", "message": "Fix bug in login form"},
+                    {"short_hash": "def456", "message": "Add new feature"},
+                ],
+                project_root=bot.repo_path,
+            )
 
-    def test_prepare_ai_prompt_fallback(self, bot: PullRequestAIAgent) -> None:
-        """Test prepare_ai_prompt method falling back to default prompt on error."""
+            # Verify the returned prompt_data is the same as mock_prompt_data
+            assert prompt_data is mock_prompt_data
+
+    @pytest.mark.parametrize(
+        ("error", "expects_fallback"),
+        [
+            pytest.param(FileNotFoundError("Test error"), False, id="template-not-found"),
+            pytest.param(Exception("Test error"), True, id="fallback"),
+        ],
+    )
+    def test_prepare_ai_prompt_template_error(
+        self, bot: PullRequestAIAgent, mocked_extract_info: MagicMock, error: Exception, expects_fallback: bool
+    ) -> None:
+        """Test prepare_ai_prompt method re-raising a missing template, or falling back to default prompt on error."""
         # Mock commits and tickets
         commits = [{"short_hash": "abc123", "message": "Fix bug in login form"}]
 
         # Create mock ticket
-        mock_ticket = MagicMock()
+        mock_ticket = cast(BaseImmutableModel, object())
 
-        # Mock prepare_pr_prompt_data to raise a generic Exception
-        with patch("pull_request_ai_agent.bot.prepare_pr_prompt_data", side_effect=Exception("Test error")):
-            # Set up _extract_ticket_info to return structured ticket info
-            with patch.object(bot, "_extract_ticket_info") as mock_extract_info:
-                mock_extract_info.return_value = {
-                    "id": "PROJ-123",
-                    "title": "Fix login bug",
-                    "description": "The login form has a bug that needs to be fixed",
-                    "status": "In Progress",
-                }
-
-                # Call prepare_ai_prompt
-                prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket])
+        # Mock prepare_pr_prompt_data to raise the error
+        with swap_attr(bot_module, "prepare_pr_prompt_data", MagicMock(side_effect=error)):
+            if not expects_fallback:
+                # Call prepare_ai_prompt should raise the same error
+                with pytest.raises(type(error)):
+                    bot.prepare_ai_prompt(commits, [mock_ticket])
+                return
 
-                # Verify the fallback prompt was returned
-                assert hasattr(prompt_data, "title")
-                assert hasattr(prompt_data, "description")
-                assert "I need you to generate a pull request title and description" in prompt_data.description
-                assert "abc123 - Fix bug in login form" in prompt_data.description
-                assert "PROJ-123: Fix login bug" in prompt_data.description
-                assert "Description: The login form has a bug that needs to be fixed" in prompt_data.description
-                assert "Status: In Progress" in prompt_data.description
+            # Call prepare_ai_prompt
+            prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket])
+
+            # Verify the fallback prompt was returned
+            assert hasattr(prompt_data, "title")
+            assert hasattr(prompt_data, "description")
+            expected_fragments = (
+                "I need you to generate a pull request title and description",
+                "abc123 - Fix bug in login form",
+                f"{_STANDARD_TICKET_INFO['id']}: {_STANDARD_TICKET_INFO['title']}",
+                f"Description: {_STANDARD_TICKET_INFO['description']}",
+                f"Status: {_STANDARD_TICKET_INFO['status']}",
+            )
+            desc = prompt_data.description
+            missing = [fragment for fragment in expected_fragments if fragment not in desc]
+            assert not missing, f"missing: {missing}"
 
-    def test_prepare_ai_prompt_invalid_commits(self, bot: PullRequestAIAgent) -> None:
+    def test_prepare_ai_prompt_invalid_commits(self, bot: PullRequestAIAgent, mocked_extract_info: MagicMock) -> None:
         """Test prepare_ai_prompt method with invalid commits."""
         # Mock commits without required fields
         commits = [
@@ -1041,97 +1003,46 @@ class TestPullRequestAIAgent:
         ]
 
         # Create mock ticket
-        mock_ticket = MagicMock()
-
-        # Mock prepare_pr_prompt_data
-        mock_prompt_data = MagicMock()
-        mock_prompt_data.title = "Test title prompt"
-
-        with patch("pull_request_ai_agent.bot.prepare_pr_prompt_data", return_value=mock_prompt_data) as mock_prepare:
-            # Set up _extract_ticket_info to return structured ticket info
-            with patch.object(bot, "_extract_ticket_info") as mock_extract_info:
-                mock_extract_info.return_value = {
-                    "id": "PROJ-123",
-                    "title": "Fix login bug",
-                    "description": "The login form has a bug that needs to be fixed",
-                    "status": "In Progress",
-                }
-
-                # Call prepare_ai_prompt
-                prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket])
-
-                # Verify prepare_pr_prompt_data was called with empty commits list
-                mock_prepare.assert_called_once()
-                call_args = mock_prepare.call_args[1]
-                assert len(call_args["commits"]) == 0
-
-                # Verify the returned prompt_data is the same as mock_prompt_data
-                assert prompt_data is mock_prompt_data
-
-    def test_prepare_ai_prompt_with_pr_template(self, bot: PullRequestAIAgent) -> None:
-        """Test prepare_ai_prompt method with PR template."""
-        # Mock commits and tickets
-        commits = [{"short_hash": "abc123", "message": "Fix bug in login form"}]
-
-        # Create mock ticket
-        mock_ticket = MagicMock()
+        mock_ticket = cast(BaseImmutableModel, object())
 
         # Mock prepare_pr_prompt_data
-        mock_prompt_data = MagicMock()
-        mock_prompt_data.title = "Test title prompt with PR template"
+        mock_prompt_data = cast(PRPromptData, SimpleNamespace(title="Test title prompt"))
 
-        with patch("pull_request_ai_agent.bot.prepare_pr_prompt_data", return_value=mock_prompt_data) as mock_prepare:
-            # Set up _extract_ticket_info to return structured ticket info
-            with patch.object(bot, "_extract_ticket_info") as mock_extract_info:
-                mock_extract_info.return_value = {
-                    "id": "PROJ-123",
-                    "title": "Fix login bug",
-                    "description": "The login form has a bug that needs to be fixed",
-                    "status": "In Progress",
-                }
-
-                # Call prepare_ai_prompt
-                prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket])
+        with swap_attr(bot_module, "prepare_pr_prompt_data", MagicMock(return_value=mock_prompt_data)) as mock_prepare:
+            # Call prepare_ai_prompt
+            prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket])
 
-                # Verify prepare_pr_prompt_data was called with project_root
-                mock_prepare.assert_called_once()
-                call_args = mock_prepare.call_args[1]
-                assert "project_root" in call_args
-                assert call_args["project_root"] == bot.repo_path
+            # Verify prepare_pr_prompt_data was called with empty commits list
+            mock_prepare.assert_called_once_with(task_tickets_details=ANY, commits=[], project_root=ANY)
 
-                # Verify the returned prompt_data is the same as mock_prompt_data
-                assert prompt_data is mock_prompt_data
+            # Verify the returned prompt_data is the same as mock_prompt_data
+            assert prompt_data is mock_prompt_data
 
-    def test_prepare_ai_prompt_fallback_with_pr_template(self, bot: PullRequestAIAgent) -> None:
+    def test_prepare_ai_prompt_fallback_with_pr_template(
+        self, bot: PullRequestAIAgent, mocked_extract_info: MagicMock
+    ) -> None:
         """Test prepare_ai_prompt fallback with PR template."""
         # Mock commits and tickets
         commits = [{"short_hash": "abc123", "message": "Fix bug in login form"}]
 
         # Create mock ticket
-        mock_ticket = MagicMock()
+        mock_ticket = cast(BaseImmutableModel, object())
 
-        # Mock PR template file
+        # Serve the PR template straight from the agent's loader
         mock_pr_template = "## PR Template\n* Task ID: \n* Description: "
 
         # Mock prepare_pr_prompt_data to raise Exception
-        with patch("pull_request_ai_agent.bot.prepare_pr_prompt_data", side_effect=Exception("Test error")):
-            # Set up _extract_ticket_info to return structured ticket info
-            with patch.object(bot, "_extract_ticket_info") as mock_extract_info:
-                mock_extract_info.return_value = {
-                    "id": "PROJ-123",
-                    "title": "Fix login bug",
-                    "description": "The login form has a bug that needs to be fixed",
-                    "status": "In Progress",
-                }
-
-                # Mock Path.exists and open for PR template
-                with patch("pathlib.Path.exists", return_value=True):
-                    with patch("builtins.open", mock_open(read_data=mock_pr_template)):
-                        # Call prepare_ai_prompt
-                        prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket])
-
-                        # Verify the fallback prompt includes PR template
-                        assert hasattr(prompt_data, "title")
-                        assert hasattr(prompt_data, "description")
-                        assert "Pull Request Template" in prompt_data.description
-                        assert mock_pr_template in prompt_data.description
+        with (
+            swap_attr(bot, "_load_pr_template", lambda: mock_pr_template),
+            swap_attr(bot_module, "prepare_pr_prompt_data", MagicMock(side_effect=Exception("Test error"))),
+        ):
+            # Call prepare_ai_prompt
+            prompt_data = bot.prepare_ai_prompt(commits, [mock_ticket])
+
+            # Verify the fallback prompt includes PR template
+            assert hasattr(prompt_data, "title")
+            assert hasattr(prompt_data, "description")
+            expected_fragments = ("Pull Request Template", mock_pr_template)
+            desc = prompt_data.description
+            missing = [fragment for fragment in expected_fragments if fragment not in desc]
+            assert not missing, f"missing: {missing}"
@@ -2,9 +2,12 @@
 Unit tests for the entry point module.
 """
 
+import logging
 import sys
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from pull_request_ai_agent.__main__ import main, parse_args, run_bot
 from pull_request_ai_agent.ai_bot import AiModuleClient
 from pull_request_ai_agent.project_management_tool import ProjectManagementToolType
@@ -26,6 +29,7 @@ class TestParseArgs:
             assert args.ai_api_key is None
             assert args.pm_tool_type == ProjectManagementToolType.CLICKUP.value
             assert args.pm_tool_api_key is None
+            assert args.verbose is False
 
     def test_parse_args_with_values(self):
         """Test parsing command line arguments with values."""
@@ -49,6 +53,7 @@ class TestParseArgs:
             "jira",
             "--pm-tool-api-key",
             "test-pm-key",
+            "--verbose",
         ]
 
         with patch.object(sys, "argv", test_args):
@@ -62,6 +67,7 @@ class TestParseArgs:
             assert args.ai_api_key == "test-ai-key"
             assert args.pm_tool_type == "jira"
             assert args.pm_tool_api_key == "test-pm-key"
+            assert args.verbose is True
 
 
 class TestRunBot:
@@ -159,9 +165,31 @@ class TestMain:
                 "pull_request_ai_agent.__main__.BotSettings.from_args", return_value=mock_settings
             ) as mock_from_args:
                 with patch("pull_request_ai_agent.__main__.run_bot") as mock_run_bot:
-                    main()
+                    with patch("pull_request_ai_agent.__main__.init_logger_config") as mock_init_logger:
+                        main()
+
+                        # Verify functions were called in the correct order
+                        mock_parse_args.assert_called_once()
+                        mock_init_logger.assert_called_once()
+                        mock_from_args.assert_called_once_with(mock_args)
+                        mock_run_bot.assert_called_once_with(mock_settings)
+
+    @pytest.mark.parametrize(
+        ("verbose", "expected_level"),
+        [
+            (True, logging.DEBUG),
+            (False, logging.INFO),
+        ],
+    )
+    def test_main_logging_level(self, verbose, expected_level):
+        """Test the main function configures the logging level from the --verbose option."""
+        mock_args = MagicMock()
+        mock_args.verbose = verbose
+
+        with patch("pull_request_ai_agent.__main__.parse_args", return_value=mock_args):
+            with patch("pull_request_ai_agent.__main__.BotSettings.from_args"):
+                with patch("pull_request_ai_agent.__main__.run_bot"):
+                    with patch("pull_request_ai_agent.__main__.init_logger_config") as mock_init_logger:
+                        main()
 
-                    # Verify functions were called in the correct order
-                    mock_parse_args.assert_called_once()
-                    mock_from_args.assert_called_once_with(mock_args)
-                    mock_run_bot.assert_called_once_with(mock_settings)
+                        mock_init_logger.assert_called_once_with(level=expected_level)